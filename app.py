@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 
+from src.storage import read_table
+
 # ---------------- CONFIGURATION & SETUP ---------------- #
 
 st.set_page_config(
@@ -206,7 +208,7 @@ def load_dashboard_data():
     base_dir = Path(__file__).resolve().parent
     data_path = base_dir / "outputs" / "dashboard" / "dashboard_data.csv"
     try:
-        return pd.read_csv(data_path)
+        return read_table(data_path)
     except FileNotFoundError:
         st.error(f"Data file not found at {data_path}. Please check the path.")
         return pd.DataFrame()
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 import pandas as pd
 from pathlib import Path
 
+from src.storage import read_table, table_exists
+
 router = APIRouter()
 
 # Data Loading Cache
@@ -17,14 +19,15 @@ def get_data(filename: str):
              base_path = base_path.parent
         
         file_path = base_path / "outputs" / "dashboard" / filename
-        if not file_path.exists():
+        if not table_exists(file_path):
              # Try other path structure from app.py vs dashboards/app.py
              file_path = base_path / "outputs" / filename
         
-        if not file_path.exists():
+        if not table_exists(file_path):
             raise FileNotFoundError(f"Data file {filename} not found at {file_path}")
             
-        DATA_CACHE[filename] = pd.read_csv(file_path)
+        # Columnar copy when present, CSV otherwise
+        DATA_CACHE[filename] = read_table(file_path)
     return DATA_CACHE[filename]
 
 @router.get("/dashboard-data")
@@ -0,0 +1,117 @@
+"""Temporal features of aggregate_monthly: grouped kernels vs per-district apply.
+
+Builds national-scale district-month tables (every registry district times
+`--months` months, one table per stream), computes the features with the
+original `groupby.apply` implementation and with `src.aggregate`, checks the
+outputs are identical and prints the timings:
+
+    python benchmarks/aggregate_features.py --months 48
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from src.aggregate import _add_features  # noqa: E402
+from src.parsing import MONTH_DTYPE, month_labels  # noqa: E402
+from src.registry import load_registry_index  # noqa: E402
+
+STREAM_BANDS = {
+    "enrol": ["child_0_5", "child_5_17", "adult_18_plus", "enrol_total"],
+    "demo": ["child_5_17", "adult_18_plus", "demo_updates"],
+    "bio": ["child_5_17", "adult_18_plus", "bio_updates"],
+}
+
+
+def district_months(months: int, bands, seed: int) -> pd.DataFrame:
+    """Every registry district x `months` months with random counts."""
+    index = load_registry_index()
+    _, district_dtype = index.location_dtypes()
+    registry = index.to_frame()
+
+    rng = np.random.default_rng(seed)
+    n = len(registry)
+    month_keys = pd.period_range("2021-01", periods=months, freq="M").asi8.astype(MONTH_DTYPE)
+
+    df = pd.DataFrame({
+        "state": np.repeat(index.official_states(registry["state_norm"]).to_numpy(), months),
+        "district_clean": pd.Categorical(np.repeat(registry["district"].to_numpy(), months), dtype=district_dtype),
+        "month": np.tile(month_keys, n),
+    })
+    for c in bands[:-1]:
+        # some empty months so the pct change sees zeros
+        counts = rng.poisson(40, len(df)) * (rng.random(len(df)) > 0.05)
+        df[c] = counts.astype("int32")
+    df[bands[-1]] = df[bands[:-1]].sum(axis=1).astype("int32")
+
+    # shuffled, as partial aggregates arrive
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def apply_features(grouped: pd.DataFrame, district_key: str) -> pd.DataFrame:
+    """The original per-district `groupby.apply` implementation."""
+    group_cols = ["state", district_key, "month"]
+    agg_cols = [c for c in grouped.columns if c not in group_cols]
+
+    grouped["total_count"] = grouped[agg_cols].sum(axis=1)
+    for c in agg_cols:
+        grouped[f"{c}_share"] = grouped[c] / grouped["total_count"].replace({0: pd.NA})
+
+    grouped = grouped.copy()
+    grouped["_month_dt"] = pd.to_datetime(month_labels(grouped["month"]) + "-01", errors="coerce")
+    grouped = grouped.sort_values(["state", district_key, "_month_dt"])
+
+    def _compute_temps(g):
+        g = g.sort_values("_month_dt")
+        g["total_count_mom_diff"] = g["total_count"].diff().fillna(0)
+        g["total_count_mom_pct"] = g["total_count"].pct_change().fillna(0)
+        g["total_count_3m_avg"] = g["total_count"].rolling(3, min_periods=1).mean()
+        return g
+
+    # grouping columns selected explicitly: pandas 3 drops them from apply
+    grouped = grouped.groupby(["state", district_key], group_keys=False, observed=True)[
+        list(grouped.columns)
+    ].apply(_compute_temps)
+    return grouped.drop(columns=["_month_dt"]).reset_index(drop=True)
+
+
+def timed(func, frame: pd.DataFrame):
+    start = time.perf_counter()
+    out = func(frame.copy(), "district_clean")
+    return out, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=48)
+    args = parser.parse_args()
+
+    total_apply = total_kernels = 0.0
+    for i, (stream, bands) in enumerate(STREAM_BANDS.items()):
+        frame = district_months(args.months, bands, seed=i)
+
+        expected, t_apply = timed(apply_features, frame)
+        actual, t_kernels = timed(_add_features, frame)
+        pd.testing.assert_frame_equal(actual, expected)
+
+        total_apply += t_apply
+        total_kernels += t_kernels
+        print(
+            f"  {stream:<6} {len(frame):>9,} district-months   "
+            f"apply {t_apply:>7.2f}s   kernels {t_kernels:>7.3f}s   identical ✅"
+        )
+
+    print(
+        f"\n⚡ Temporal features: {total_apply:.2f}s -> {total_kernels:.3f}s "
+        f"({total_apply / total_kernels:.0f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Peak RSS of the pipeline stages in copy vs in-place execution mode.
+
+Each mode runs in its own subprocess (peak RSS is per process) on the raw
+data under data/raw:
+
+    python benchmarks/pipeline_memory.py
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+
+def run_stages(inplace: bool) -> None:
+    from src.execution import MemoryReport, set_inplace
+    from src.quality import QualitySnapshot
+    from src.ingest import load_uidai_data
+    from src.standardize import standardize_enrol, standardize_demo, standardize_bio
+    from src.normalize_districts import load_district_registry, apply_district_normalization
+    from src.aggregate import aggregate_monthly
+    from src.merge_streams import merge_streams
+    from src.risk import compute_risk
+    from src.predict import simple_forecast
+    from src.action import recommend_actions
+
+    set_inplace(inplace)
+    memory = MemoryReport()
+
+    enrol, demo, bio = load_uidai_data(use_cache=False)
+    memory.checkpoint("load")
+
+    enrol = standardize_enrol(enrol)
+    demo = standardize_demo(demo)
+    bio = standardize_bio(bio)
+    quality = QualitySnapshot.capture(enrol)
+    memory.checkpoint("standardize")
+
+    registry = load_district_registry()
+    enrol = apply_district_normalization(enrol, registry)
+    demo = apply_district_normalization(demo, registry)
+    bio = apply_district_normalization(bio, registry)
+    quality.record_invalid(enrol)
+    memory.checkpoint("normalize")
+
+    final = merge_streams(aggregate_monthly(enrol), aggregate_monthly(demo), aggregate_monthly(bio))
+    memory.checkpoint("aggregate_merge")
+
+    final = recommend_actions(simple_forecast(compute_risk(final)))
+    memory.checkpoint("risk_forecast_actions")
+
+    memory.print()
+    memory.save("outputs/reports/memory_report.csv")
+    del quality
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["copy", "inplace"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_stages(args.mode == "inplace")
+        return
+
+    for mode in ("copy", "inplace"):
+        subprocess.run([sys.executable, __file__, "--mode", mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
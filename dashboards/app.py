@@ -1,19 +1,50 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 from dash import Dash, dcc, html, Input, Output
 import plotly.express as px
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cube import build_cube, load_cube
+from src.parsing import month_labels
+from src.storage import read_table
+
+MASTER_TABLE = "../outputs/final_master_table.csv"
+METRICS = ["enrol_total", "risk_flag", "update_pressure"]
+
 # -------------------------------------------------
 # Load processed data (pipeline output only)
 # -------------------------------------------------
-df = pd.read_csv("../outputs/final_master_table.csv")
+# Memory-mapped district x month cube; a state is a contiguous block of it,
+# so the callback slices instead of scanning the whole table. Rebuilt from
+# the master table when missing or older than it
+cube = load_cube("../outputs/cube", source=MASTER_TABLE)
+if cube is None:
+    cube = build_cube(
+        read_table(MASTER_TABLE, columns=["state", "district_clean", "month", *METRICS]),
+        metrics=METRICS
+    )
 
-# Normalize state text (safety)
-df["state"] = df["state"].str.upper().str.strip()
+# Normalize state text (safety): dropdown value -> cube state
+cube_states = {s.upper().strip(): s for s in cube.states}
 
 # Get list of states
-states = sorted(df["state"].unique())
+states = sorted(cube_states)
 states.insert(0, "ALL")
 
+
+def state_frame(state=None):
+    """Long rows of one state (or all), months as YYYY-MM labels."""
+    dff = cube.frame(state, metrics=METRICS)
+    dff["state"] = dff["state"].str.upper().str.strip()
+    dff["risk_flag"] = dff["risk_flag"] > 0
+
+    # Month keys are period ordinals: chronological order, then YYYY-MM labels
+    dff = dff.sort_values("month", kind="stable")
+    dff["month"] = month_labels(dff["month"])
+    return dff
+
 # -------------------------------------------------
 # App
 # -------------------------------------------------
@@ -67,10 +98,10 @@ app.layout = html.Div([
 def update_dashboard(selected_state):
 
     if selected_state == "ALL":
-        dff = df.copy()
+        dff = state_frame()
         title_suffix = "All States"
     else:
-        dff = df[df["state"] == selected_state]
+        dff = state_frame(cube_states[selected_state])
         title_suffix = selected_state.title()
 
     # ---- Correct district count (STATE-WISE) ----
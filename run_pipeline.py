@@ -1,3 +1,5 @@
+import argparse
+
 from src.ingest import load_uidai_data
 from src.standardize import (
     standardize_enrol,
@@ -18,11 +20,33 @@ from src.eda import (
     invalid_districts_chart
 )
 from src.analysis import generate_state_analysis
+from src.storage import write_table
+from src.execution import MemoryReport, set_inplace
+from src.quality import QualitySnapshot
+from src.cube import CUBE_DIR, build_cube, save_cube
+
+parser = argparse.ArgumentParser(description="Run the UIDAI district pipeline")
+parser.add_argument(
+    "--inplace",
+    action="store_true",
+    help="Copy-free execution: stages share buffers instead of deep-copying frames"
+)
+parser.add_argument(
+    "--memory-report",
+    action="store_true",
+    help="Print RSS per stage and append it to outputs/reports/memory_report.csv"
+)
+args = parser.parse_args()
+
+if args.inplace:
+    set_inplace(True)
+memory = MemoryReport()
 
 # =====================================================
 # 1️⃣ LOAD RAW UIDAI DATA
 # =====================================================
 enrol, demo, bio = load_uidai_data()
+memory.checkpoint("load")
 
 # =====================================================
 # 2️⃣ STANDARDIZE AGE SCHEMAS
@@ -30,12 +54,14 @@ enrol, demo, bio = load_uidai_data()
 enrol = standardize_enrol(enrol)
 demo  = standardize_demo(demo)
 bio   = standardize_bio(bio)
+memory.checkpoint("standardize")
 
 # =====================================================
-# 3️⃣ SAVE SNAPSHOT (BEFORE DISTRICT NORMALIZATION)
+# 3️⃣ QUALITY SNAPSHOT (BEFORE DISTRICT NORMALIZATION)
 # =====================================================
-# This is CRITICAL for before vs after comparison
-enrol_before_norm = enrol.copy()
+# This is CRITICAL for before vs after comparison: raw district names and
+# counts per state, instead of keeping a copy of the whole enrolment frame
+enrol_quality = QualitySnapshot.capture(enrol)
 
 # =====================================================
 # 4️⃣ NORMALIZE DISTRICTS USING OFFICIAL REGISTRY
@@ -45,6 +71,8 @@ registry = load_district_registry()
 enrol = apply_district_normalization(enrol, registry)
 demo  = apply_district_normalization(demo, registry)
 bio   = apply_district_normalization(bio, registry)
+enrol_quality.record_invalid(enrol)
+memory.checkpoint("normalize")
 
 # =====================================================
 # 5️⃣ AGGREGATE MONTHLY (DISTRICT + MONTH)
@@ -52,6 +80,7 @@ bio   = apply_district_normalization(bio, registry)
 enrol_m = aggregate_monthly(enrol)
 demo_m  = aggregate_monthly(demo)
 bio_m   = aggregate_monthly(bio)
+memory.checkpoint("aggregate")
 
 # =====================================================
 # 6️⃣ MERGE ENROL + DEMO + BIO STREAMS
@@ -64,26 +93,36 @@ final = merge_streams(enrol_m, demo_m, bio_m)
 final = compute_risk(final)
 final = simple_forecast(final)
 final = recommend_actions(final)
+memory.checkpoint("risk_forecast_actions")
 
 # =====================================================
 # 8️⃣ SAVE FINAL MASTER TABLE
 # =====================================================
-final.to_csv("outputs/final_master_table.csv", index=False)
+write_table(final, "outputs/final_master_table.csv")
+
+# Dense district x month x metric cube of the same table (memory-mapped
+# .npy files) for slicing a district, a state or a month without a scan
+save_cube(build_cube(final), CUBE_DIR)
+memory.checkpoint("save")
+
+if args.memory_report:
+    memory.print()
+    memory.save("outputs/reports/memory_report.csv")
 
 print("✅ Pipeline executed successfully")
 
 # =====================================================
 # 9️⃣ BEFORE vs AFTER DATA QUALITY CHARTS
 # =====================================================
-before_df = enrol_before_norm   # before normalization
-after_df  = enrol               # after normalization
+before_df = enrol_quality   # before normalization
+after_df  = enrol           # after normalization
 
 before_after_district_count(
     before_df,
     after_df,
     state="Gujarat"
 )
-invalid_districts_chart(after_df)
+invalid_districts_chart(enrol_quality)
 
 print("📊 Before vs After charts generated")
 
@@ -94,7 +133,7 @@ states = sorted(final["state"].dropna().unique())
 for st in states:
     try:
         print(f"🔎 Generating analysis for {st}")
-        generate_state_analysis(enrol_before_norm, demo, bio, st)
+        generate_state_analysis(enrol, demo, bio, st, quality=enrol_quality)
         # before vs after chart per state
         before_after_district_count(before_df, after_df, state=st)
     except Exception as e:
@@ -1,5 +1,8 @@
+from src.execution import working_copy
+
+
 def recommend_actions(df):
-    df = df.copy()
+    df = working_copy(df)
 
     df["action"] = "Normal"
 
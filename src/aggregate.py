@@ -1,48 +1,120 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
 import pandas as pd
 
+from src.execution import working_copy
+from src.manifest import load_manifest, save_manifest
+from src.parsing import month_ordinals, parse_dates, parse_month_labels
+from src.storage import read_table, remove_path, remove_table, table_exists, write_table
 
-def aggregate_monthly(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate to district-month level and add simple feature engineering.
 
-    Features added:
-    - `total_count`: sum of numeric columns for the district-month
-    - `<col>_share`: share of each numeric column over `total_count`
-    - `total_count_mom_pct`: month-over-month percent change of `total_count`
-    - `total_count_mom_diff`: month-over-month absolute difference
-    - `total_count_3m_avg`: rolling 3-month average of `total_count`
+# Partial aggregates kept before they are folded into one frame
+COMBINE_EVERY = 8
 
-    The function uses `district_clean` if present, otherwise `district`.
-    """
-    df = df.copy()
+# Persisted district-month state of `update_monthly`, one directory per name
+AGGREGATE_STATE_DIR = Path("outputs/cache/aggregate")
+
+# Bump when the persisted state layout changes; a state written by another
+# version is refused until it is rebuilt (`update_monthly(..., rebuild=True)`)
+AGGREGATE_STATE_VERSION = 3
+
+# Rows before the first changed month that the temporal features look back
+# on (1 for the month-over-month lag, 2 for the 3-month rolling average)
+FEATURE_LOOKBACK = 2
 
-    # ensure date parsed
+# Raw rows behind each district-month, kept in the persisted state only
+ROWS_COL = "_rows"
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse `date`, derive `month` (int32 period ordinal) and return the frame."""
+    df = working_copy(df)
+
+    # ensure date parsed (no-op for frames coming from ingest)
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], dayfirst=True, errors="coerce")
+        df["date"], _ = parse_dates(df["date"])
 
-    # create month in YYYY-MM
+    # month as an int32 period ordinal; `YYYY-MM` text only for presentation
     if "month" not in df.columns:
-        if "date" in df.columns:
-            df["month"] = df["date"].dt.to_period("M").astype(str)
-        else:
-            df["month"] = df["month"].astype(str)
+        df["month"] = month_ordinals(df["date"])
+    elif not pd.api.types.is_integer_dtype(df["month"]):
+        df["month"] = parse_month_labels(df["month"])
 
-    # choose district key
-    district_key = "district_clean" if "district_clean" in df.columns else "district"
+    return df
 
-    group_cols = ["state", district_key, "month"]
 
-    # aggregate only numeric columns
-    agg_cols = df.select_dtypes("number").columns.tolist()
+def _district_key(df: pd.DataFrame) -> str:
+    return "district_clean" if "district_clean" in df.columns else "district"
+
 
-    # if there are no numeric cols, return empty grouped frame
+def partial_monthly(df: pd.DataFrame, rows: bool = False) -> pd.DataFrame:
+    """District-month sums of one batch; combine with `combine_partials`.
+
+    With `rows`, a `_rows` column counts the raw rows of each district-month.
+    """
+    df = _prepare(df)
+    group_cols = ["state", _district_key(df), "month"]
+    groups = df.groupby(group_cols, as_index=False, observed=True)
+
+    agg_cols = [c for c in df.select_dtypes("number").columns if c not in group_cols]
     if not agg_cols:
-        return df.groupby(group_cols, as_index=False).size().to_frame(name="count")
+        partial = groups.size().rename(columns={"size": "count"})
+    else:
+        partial = groups[agg_cols].sum(min_count=1)
+
+    if rows:
+        partial[ROWS_COL] = groups.size()["size"].to_numpy()
+    return partial
+
+
+def combine_partials(partials) -> pd.DataFrame:
+    """Sum partial district-month aggregates that may share keys."""
+    partials = [p for p in partials if p is not None]
+    if len(partials) == 1:
+        return partials[0]
 
-    grouped = (
-        df.groupby(group_cols, as_index=False)[agg_cols]
+    # normalized batches share the registry categoricals, so the keys stay
+    # categorical; batches with differing categories concat to plain text
+    combined = pd.concat(partials, ignore_index=True)
+    group_cols = ["state", _district_key(combined), "month"]
+    value_cols = [c for c in combined.columns if c not in group_cols]
+
+    return (
+        combined.groupby(group_cols, as_index=False, observed=True)[value_cols]
         .sum(min_count=1)
     )
 
+
+def _fold(df, rows: bool = False) -> Optional[pd.DataFrame]:
+    """District-month sums of a frame or an iterable of batches (None if empty)."""
+    if isinstance(df, pd.DataFrame):
+        return partial_monthly(df, rows)
+
+    partials = []
+    for batch in df:
+        partials.append(partial_monthly(batch, rows))
+        if len(partials) >= COMBINE_EVERY:
+            partials = [combine_partials(partials)]
+    return combine_partials(partials) if partials else None
+
+
+def _is_count_only(grouped: pd.DataFrame) -> bool:
+    return [c for c in grouped.columns[3:] if c != ROWS_COL] == ["count"]
+
+
+def _sort_district_months(df: pd.DataFrame, district_key: str) -> pd.DataFrame:
+    """Rows ordered by state, district, then month (unknown months last)."""
+    df = df.sort_values(["state", district_key, "month"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _add_features(grouped: pd.DataFrame, district_key: str) -> pd.DataFrame:
+    group_cols = ["state", district_key, "month"]
+    agg_cols = [c for c in grouped.columns if c not in group_cols and c != ROWS_COL]
+
     # feature: total_count (sum across numeric columns)
     grouped["total_count"] = grouped[agg_cols].sum(axis=1)
 
@@ -52,23 +124,249 @@ def aggregate_monthly(df: pd.DataFrame) -> pd.DataFrame:
         grouped[share_col] = grouped[c] / grouped["total_count"].replace({0: pd.NA})
 
     # temporal features: month-over-month and rolling averages per state+district
-    # convert month to datetime for sorting
-    grouped = grouped.copy()
-    grouped["_month_dt"] = pd.to_datetime(grouped["month"] + "-01", errors="coerce")
-
-    grouped = grouped.sort_values(["state", district_key, "_month_dt"]) 
+    grouped = _sort_district_months(grouped, district_key)
 
-    def _compute_temps(g):
-        g = g.sort_values("_month_dt")
-        g["total_count_mom_diff"] = g["total_count"].diff().fillna(0)
-        # pct change: where previous is zero -> inf/NaN, keep NaN
-        g["total_count_mom_pct"] = g["total_count"].pct_change().fillna(0)
-        g["total_count_3m_avg"] = g["total_count"].rolling(3, min_periods=1).mean()
-        return g
+    # position of each row within its district's month series
+    pos = grouped.groupby(["state", district_key], observed=True, sort=False).cumcount().to_numpy()
+    total = grouped["total_count"].to_numpy(dtype="float64")
 
-    grouped = grouped.groupby(["state", district_key], group_keys=False).apply(_compute_temps)
+    prev = _group_lag(total, pos, 1)
+    diff = total - prev
+    grouped["total_count_mom_diff"] = np.where(np.isnan(diff), 0.0, diff)
+    # pct change: where previous is zero -> inf/NaN, keep NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = total / prev - 1
+    grouped["total_count_mom_pct"] = np.where(np.isnan(pct), 0.0, pct)
+    grouped["total_count_3m_avg"] = _group_rolling_mean(total, pos, 3)
 
-    # cleanup helper column
-    grouped = grouped.drop(columns=["_month_dt"]).reset_index(drop=True)
+    # nullable counts keep nullable features, as Series.diff / pct_change do
+    count_dtype = grouped["total_count"].dtype
+    if isinstance(count_dtype, pd.api.extensions.ExtensionDtype):
+        grouped["total_count_mom_diff"] = grouped["total_count_mom_diff"].astype(count_dtype)
+        grouped["total_count_mom_pct"] = grouped["total_count_mom_pct"].astype("Float64")
 
     return grouped
+
+
+# ---------------- GROUPED KERNELS ---------------- #
+#
+# Lag / rolling kernels over a frame sorted by group then time, where `pos`
+# is each row's position within its group (`groupby.cumcount`). Each is a
+# few numpy passes over the whole frame, however many groups there are.
+
+def _group_lag(values: np.ndarray, pos: np.ndarray, k: int) -> np.ndarray:
+    """`values` shifted down `k` rows within each group (NaN at group starts)."""
+    lagged = np.full(len(values), np.nan)
+    if k < len(values):
+        lagged[k:] = values[:-k]
+    lagged[pos < k] = np.nan
+    return lagged
+
+
+def _group_rolling_mean(values: np.ndarray, pos: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-row mean within each group (min_periods=1)."""
+    total = np.zeros(len(values))
+    seen = np.zeros(len(values))
+    for k in range(window):
+        lagged = values if k == 0 else _group_lag(values, pos, k)
+        present = ~np.isnan(lagged)
+        total += np.where(present, lagged, 0.0)
+        seen += present
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(seen > 0, total / seen, np.nan)
+
+
+def aggregate_monthly(df) -> pd.DataFrame:
+    """Aggregate to district-month level and add simple feature engineering.
+
+    Features added:
+    - `total_count`: sum of numeric columns for the district-month
+    - `<col>_share`: share of each numeric column over `total_count`
+    - `total_count_mom_pct`: month-over-month percent change of `total_count`
+    - `total_count_mom_diff`: month-over-month absolute difference
+    - `total_count_3m_avg`: rolling 3-month average of `total_count`
+
+    The function uses `district_clean` if present, otherwise `district`.
+    `month` is an int32 period ordinal (`src.parsing.month_labels` gives the
+    `YYYY-MM` text).
+
+    `df` may also be an iterable of batch DataFrames (e.g. from
+    `iter_uidai_batches`): each batch is reduced to district-month sums as
+    it arrives and the partial sums are combined before the features are
+    computed, so the batches never need to be in memory together.
+    """
+    grouped = _fold(df)
+    if grouped is None:
+        return pd.DataFrame()
+
+    # if there are no numeric cols, return the grouped counts
+    if _is_count_only(grouped):
+        return grouped
+
+    return _add_features(grouped, _district_key(grouped))
+
+
+# ---------------- INCREMENTAL STATE ---------------- #
+
+def _state_paths(name: str, state_dir) -> tuple:
+    """(table, sources manifest, partials directory) of a persisted state.
+
+    Partials sit in a directory per state version, so partials written in
+    another layout are never read back.
+    """
+    root = Path(state_dir) / name
+    return root / "monthly", root / "sources.json", root / "partials" / f"v{AGGREGATE_STATE_VERSION}"
+
+
+def _partial_path(partials_dir: Path, source: str) -> Path:
+    return partials_dir / hashlib.sha1(source.encode()).hexdigest()[:16]
+
+
+def _negated(partial: pd.DataFrame) -> pd.DataFrame:
+    partial = partial.copy()
+    value_cols = partial.columns[3:]
+    partial[value_cols] = -partial[value_cols]
+    return partial
+
+
+def _tail_window(table: pd.DataFrame, delta: pd.DataFrame, district_key: str):
+    """Rows of the sorted `table` whose features change with `delta`.
+
+    Returns boolean masks (tail, context): the tail is every month of an
+    affected district from its first changed month on, the context the
+    `FEATURE_LOOKBACK` rows before it that the lag / rolling features read.
+    """
+    keys = ["state", district_key]
+    first = delta.groupby(keys, observed=True)["month"].min()
+    row_first = first.reindex(pd.MultiIndex.from_frame(table[keys])).to_numpy()
+
+    affected = pd.notna(row_first)
+    months = table["month"].to_numpy()
+    tail = affected.copy()
+    tail[affected] = months[affected] >= row_first[affected]
+
+    # the last FEATURE_LOOKBACK unchanged months of each affected district
+    earlier = affected & ~tail
+    from_end = (
+        table[earlier].groupby(keys, observed=True, sort=False).cumcount(ascending=False)
+    )
+    context = np.zeros(len(table), dtype=bool)
+    context[np.flatnonzero(earlier)[from_end.to_numpy() < FEATURE_LOOKBACK]] = True
+    return tail, context
+
+
+def load_monthly_state(name: str, state_dir=AGGREGATE_STATE_DIR) -> Optional[pd.DataFrame]:
+    """The persisted aggregate of `update_monthly` (None before the first update)."""
+    table_path, _, _ = _state_paths(name, state_dir)
+    if not table_exists(table_path):
+        return None
+    return read_table(table_path).drop(columns=[ROWS_COL])
+
+
+def update_monthly(name: str,
+                   sources: Dict[str, object],
+                   removed: Iterable[str] = (),
+                   state_dir=AGGREGATE_STATE_DIR,
+                   rebuild: bool = False) -> Optional[pd.DataFrame]:
+    """Fold new raw rows into a persisted district-month aggregate.
+
+    `sources` maps a source id (e.g. a shard path) to its normalized rows,
+    as a DataFrame or an iterable of batches. Each source is reduced to
+    district-month partial sums, which are kept under
+    `state_dir/<name>/partials`, so a source given again replaces its old
+    contribution and a `removed` one is subtracted. The summed table is
+    persisted in `state_dir/<name>/monthly`.
+
+    Only the tail of each affected district (months from its first changed
+    month on) is re-summed and gets its shares, MoM diff / pct and 3-month
+    average recomputed, reading `FEATURE_LOOKBACK` earlier months for
+    context; every other district-month is left as stored. The result
+    equals `aggregate_monthly` over all sources folded so far (None while
+    nothing has been folded).
+
+    If the summed table is missing it is rebuilt from the stored partials.
+    A state written by another `AGGREGATE_STATE_VERSION` raises ValueError
+    rather than silently dropping the sources folded into it; `rebuild`
+    discards the state, so `sources` must then list every source.
+    """
+    table_path, sources_path, partials_dir = _state_paths(name, state_dir)
+    if rebuild:
+        remove_path(table_path.parent)
+    partials_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(sources_path)
+    known = manifest.get("files", {})
+    if known and manifest.get("version") != AGGREGATE_STATE_VERSION:
+        raise ValueError(
+            f"Aggregate state '{name}' was written by version {manifest.get('version')} "
+            f"(current: {AGGREGATE_STATE_VERSION}); refold every source with "
+            f"update_monthly(..., rebuild=True)"
+        )
+
+    table = read_table(table_path) if known and table_exists(table_path) else None
+    deltas = []
+    if known and table is None:
+        # the summed table is gone, the partials are not: start from them
+        print(f"⚠️  {name}: aggregate table missing, rebuilding it from {len(known)} stored partials")
+        deltas = [read_table(_partial_path(partials_dir, source)) for source in known]
+    for source in removed:
+        if source in known:
+            path = _partial_path(partials_dir, source)
+            deltas.append(_negated(read_table(path)))
+            remove_table(path)
+            del known[source]
+
+    for source, data in sources.items():
+        path = _partial_path(partials_dir, source)
+        if source in known:
+            deltas.append(_negated(read_table(path)))
+            del known[source]
+
+        partial = _fold(data, rows=True)
+        if partial is None or partial.empty:
+            remove_table(path)
+            continue
+        write_table(partial, path, formats=("columnar",))
+        known[source] = {"rows": int(partial[ROWS_COL].sum())}
+        deltas.append(partial)
+
+    if not deltas:
+        return None if table is None else table.drop(columns=[ROWS_COL])
+
+    delta = combine_partials(deltas)
+    district_key = _district_key(delta)
+
+    if table is None:
+        sums = delta[delta[ROWS_COL] > 0].reset_index(drop=True)
+        table = sums if _is_count_only(sums) else _add_features(sums, district_key)
+        touched = len(table)
+    else:
+        tail, context = _tail_window(table, delta, district_key)
+        sum_cols = delta.columns.tolist()
+
+        tail_sums = combine_partials([table.loc[tail, sum_cols], delta])
+        tail_sums = tail_sums[tail_sums[ROWS_COL] > 0]
+
+        if _is_count_only(tail_sums):
+            fresh = tail_sums
+        else:
+            month_keys = ["state", district_key, "month"]
+            history = table.loc[context, sum_cols]
+            window = _add_features(pd.concat([history, tail_sums], ignore_index=True), district_key)
+            # context rows only supply the look-back: keep the recomputed tail
+            is_history = pd.MultiIndex.from_frame(window[month_keys]).isin(
+                pd.MultiIndex.from_frame(history[month_keys])
+            )
+            fresh = window[~is_history]
+
+        touched = len(fresh)
+        table = _sort_district_months(
+            pd.concat([table[~tail], fresh], ignore_index=True), district_key
+        )
+
+    write_table(table, table_path, formats=("columnar",))
+    manifest["files"] = known
+    manifest["version"] = AGGREGATE_STATE_VERSION
+    save_manifest(manifest, sources_path)
+
+    print(f"♻️  {name}: recomputed {touched:,} of {len(table):,} district-month rows")
+    return table.drop(columns=[ROWS_COL])
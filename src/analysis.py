@@ -5,6 +5,8 @@ from typing import Optional, List
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from src.quality import QualitySnapshot
+
 try:
     import seaborn as sns
     _HAS_SEABORN = True
@@ -126,13 +128,15 @@ def trivariate_analysis(df: pd.DataFrame, x: str, y: str, hue: Optional[str], ou
     plt.close()
 
 
-def generate_state_analysis(enrol: pd.DataFrame, demo: pd.DataFrame, bio: pd.DataFrame, state: str, outdir_root: str = "outputs/reports") -> None:
+def generate_state_analysis(enrol: pd.DataFrame, demo: pd.DataFrame, bio: pd.DataFrame, state: str, outdir_root: str = "outputs/reports", quality: Optional[QualitySnapshot] = None) -> None:
     """Top-level function to generate uni/bi/trivariate analyses for a given state.
 
     - Filters datasets to the state
     - Produces univariate summaries for each stream
     - Produces a bivariate correlation heatmap across aggregated district-level features
     - Produces example trivariate plots for top numeric features
+    - With a `quality` snapshot, saves the state's raw district names
+      (rows and invalid-row counts) from before normalization
     """
     state_upper = state.upper()
     out_root = Path(outdir_root) / state_lower(state)
@@ -142,6 +146,9 @@ def generate_state_analysis(enrol: pd.DataFrame, demo: pd.DataFrame, bio: pd.Dat
     d = demo[demo["state"].str.upper() == state_upper] if not demo.empty else pd.DataFrame()
     b = bio[bio["state"].str.upper() == state_upper] if not bio.empty else pd.DataFrame()
 
+    if quality is not None:
+        quality.state_names(state).to_csv(out_root / "district_names_before.csv", index=False)
+
     # univariate per-stream
     univariate_analysis(e, str(out_root / "enrol_univariate"), prefix="enrol")
     univariate_analysis(d, str(out_root / "demo_univariate"), prefix="demo")
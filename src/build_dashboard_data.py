@@ -1,6 +1,14 @@
-import pandas as pd
+import sys
 from pathlib import Path
 
+# Allow running as `python src/build_dashboard_data.py` as well as importing
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cleaning_rules import clean_unique
+from src.registry import load_registry_index
+from src.storage import read_table, write_table
+
 
 # ---------------- PATHS ---------------- #
 
@@ -15,25 +23,8 @@ DASHBOARD_DIR.mkdir(parents=True, exist_ok=True)
 
 # ---------------- LOAD REGISTRY ---------------- #
 
-registry = pd.read_csv(REGISTRY_PATH)
-
-registry["state_norm"] = (
-    registry["state"]
-    .astype(str)
-    .str.upper()
-    .str.strip()
-)
-
-registry["district_norm"] = (
-    registry["district"]
-    .astype(str)
-    .str.upper()
-    .str.strip()
-)
-
-official_pairs = set(
-    zip(registry["state_norm"], registry["district_norm"])
-)
+# Compiled once per process (and cached on disk) instead of re-parsing the CSV
+registry_index = load_registry_index(REGISTRY_PATH)
 
 
 # ---------------- HELPER ---------------- #
@@ -43,33 +34,21 @@ def load_and_prepare(path, value_columns):
     Load a normalized dataset, keep only official districts,
     and aggregate for dashboard use.
     """
-    df = pd.read_csv(path)
+    # Only the columns the dashboard needs (columnar copy when available)
+    df = read_table(path, columns=["state", "district_final", *value_columns])
 
-    df["state_norm"] = (
-        df["state"]
-        .astype(str)
-        .str.upper()
-        .str.strip()
-    )
-
-    df["district_norm"] = (
-        df["district_final"]
-        .astype(str)
-        .str.upper()
-        .str.strip()
-    )
+    # Same normalization the registry index was compiled with
+    df["state_norm"] = clean_unique(df["state"])
+    df["district_norm"] = clean_unique(df["district_final"])
 
     # Keep only official (state, district)
     df = df[
-        df.apply(
-            lambda r: (r["state_norm"], r["district_norm"]) in official_pairs,
-            axis=1
-        )
+        registry_index.contains_pairs(df["state_norm"], df["district_norm"])
     ]
 
     # Aggregate
     df_agg = (
-        df.groupby(["state", "district_final"], as_index=False)[value_columns]
+        df.groupby(["state", "district_final"], as_index=False, observed=True)[value_columns]
         .sum()
     )
 
@@ -114,7 +93,7 @@ dashboard_df = dashboard_df.sort_values(
 # ---------------- SAVE ---------------- #
 
 out_file = DASHBOARD_DIR / "dashboard_data.csv"
-dashboard_df.to_csv(out_file, index=False)
+write_table(dashboard_df, out_file)
 
 print("✅ Dashboard data created successfully")
 print(f"📁 Output → {out_file}")
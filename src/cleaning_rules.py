@@ -0,0 +1,67 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.registry import clean_text
+
+
+# ---------------- HELPERS ---------------- #
+
+def map_unique(s: pd.Series, func) -> pd.Series:
+    """Apply a Series -> Series transform to the distinct values of `s` only.
+
+    `s` is factorized (categoricals reuse their own codes), `func` runs on
+    the (small) Series of uniques and the results are gathered back to row
+    level by code.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # missing values (code -1) take the mapping of a trailing NaN
+        codes = s.cat.codes.to_numpy()
+        uniques = np.append(s.cat.categories.to_numpy(dtype=object), np.nan)
+    else:
+        codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    mapped = func(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    return pd.Series(mapped[codes], index=s.index, name=s.name)
+
+
+def clean_unique(s: pd.Series) -> pd.Series:
+    """`clean_text` evaluated once per distinct value."""
+    return map_unique(s, clean_text)
+
+
+# ---------------- RULE ENGINE ---------------- #
+
+class CleaningRules:
+    """Compiled cleanup, state rename and garbage rules for raw location text.
+
+    Every rule is evaluated on the distinct values of a column and broadcast
+    back, so the per-row cost is a single integer gather regardless of how
+    many rules run.
+    """
+
+    __slots__ = ("state_renames", "garbage_regex")
+
+    def __init__(self, state_renames: dict, garbage_patterns: list):
+        self.state_renames = dict(state_renames)
+        self.garbage_regex = re.compile("|".join(garbage_patterns), re.IGNORECASE)
+
+    def _states(self, uniques: pd.Series) -> pd.Series:
+        cleaned = clean_text(uniques)
+        return cleaned.map(lambda x: self.state_renames.get(x, x))
+
+    def _garbage(self, uniques: pd.Series) -> pd.Series:
+        search = self.garbage_regex.search
+        return uniques.map(lambda x: isinstance(x, str) and search(x) is not None)
+
+    def normalize_states(self, s: pd.Series) -> pd.Series:
+        """Cleaned, upper-cased state names with `state_renames` applied."""
+        return map_unique(s, self._states)
+
+    def normalize_districts(self, s: pd.Series) -> pd.Series:
+        """Cleaned, upper-cased district names."""
+        return clean_unique(s)
+
+    def garbage_mask(self, s: pd.Series) -> np.ndarray:
+        """True where the raw value matches one of the garbage patterns."""
+        return map_unique(s, self._garbage).to_numpy(dtype=bool)
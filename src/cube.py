@@ -0,0 +1,287 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.merge_streams import MERGE_KEYS
+from src.parsing import MONTH_DTYPE, MONTH_NA, month_labels, parse_month_labels
+from src.storage import remove_path, table_mtime
+
+
+# ---------------- CONFIG ---------------- #
+
+# Where the pipeline persists the cube of the final master table
+CUBE_DIR = Path("outputs/cube")
+
+# Bumped whenever the on-disk layout changes; older cubes are not loaded
+CUBE_VERSION = 1
+
+# Cell dtype: counts, shares and flags all fit, and NaN marks "no value"
+CUBE_DTYPE = "float64"
+
+VALUES_FILE = "values.npy"
+PRESENT_FILE = "present.npy"
+META_FILE = "_meta.json"
+
+# Inferred kinds of object columns that still hold numbers (e.g. shares
+# that went through an NA fill); they become metrics too
+NUMERIC_KINDS = ("integer", "floating", "mixed-integer-float", "decimal", "boolean")
+
+
+# ---------------- CUBE ---------------- #
+
+class DistrictCube:
+    """Dense metric x district x month array of the merged monthly table.
+
+    `values[m, d, t]` is metric `metrics[m]` of district `d` in month
+    `month_start + t` (NaN where the long table has no value) and
+    `present[d, t]` tells which district-months the long table had a row
+    for. Districts are ordered by state, then name, so every state is a
+    contiguous block of districts and months are a contiguous range:
+    a district's history, a state's month or one month across the country
+    are plain array views found through the index maps, with no scan of
+    the long table.
+    """
+
+    __slots__ = (
+        "values", "present", "metrics", "states", "district_states",
+        "districts", "month_start", "metric_index", "district_index",
+        "state_slices",
+    )
+
+    def __init__(self, values: np.ndarray, present: np.ndarray, metrics: Sequence[str],
+                 states: Sequence[str], district_states: np.ndarray,
+                 districts: Sequence[str], month_start: int):
+        self.values = values
+        self.present = present
+        self.metrics = list(metrics)
+        self.states = list(states)
+        self.district_states = np.asarray(district_states, dtype=np.int32)
+        self.districts = list(districts)
+        self.month_start = int(month_start)
+
+        # index maps: name -> position along each axis
+        self.metric_index = {m: i for i, m in enumerate(self.metrics)}
+        self.district_index = {
+            (self.states[s], d): i
+            for i, (s, d) in enumerate(zip(self.district_states, self.districts))
+        }
+        bounds = np.searchsorted(self.district_states, np.arange(len(self.states) + 1))
+        self.state_slices = {
+            state: slice(int(bounds[i]), int(bounds[i + 1]))
+            for i, state in enumerate(self.states)
+        }
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    @property
+    def months(self) -> np.ndarray:
+        """Month ordinal of every position along the month axis."""
+        return np.arange(self.values.shape[2], dtype=MONTH_DTYPE) + np.int32(self.month_start)
+
+    # -------- index maps -------- #
+
+    def month_pos(self, month) -> int:
+        """Position of a month ordinal (or `YYYY-MM` label) on the month axis."""
+        if isinstance(month, str):
+            month = parse_month_labels(pd.Series([month])).iloc[0]
+        pos = int(month) - self.month_start
+        if not 0 <= pos < self.values.shape[2]:
+            raise KeyError(f"Month {month} is not in the cube")
+        return pos
+
+    def _metric(self, metric: Optional[str]):
+        return slice(None) if metric is None else self.metric_index[metric]
+
+    # -------- views -------- #
+
+    def district(self, state: str, district: str, metric: Optional[str] = None) -> np.ndarray:
+        """History of one district: (metrics, months), or (months,) for one metric."""
+        return self.values[self._metric(metric), self.district_index[(state, district)]]
+
+    def state(self, state: str, metric: Optional[str] = None) -> np.ndarray:
+        """Districts of one state: (metrics, districts, months), or (districts, months)."""
+        return self.values[self._metric(metric), self.state_slices[state]]
+
+    def month(self, month, metric: Optional[str] = None) -> np.ndarray:
+        """Every district in one month: (metrics, districts), or (districts,)."""
+        return self.values[self._metric(metric), :, self.month_pos(month)]
+
+    def state_month(self, state: str, month, metric: Optional[str] = None) -> np.ndarray:
+        """Districts of one state in one month: (metrics, districts), or (districts,)."""
+        return self.values[self._metric(metric), self.state_slices[state], self.month_pos(month)]
+
+    def state_districts(self, state: str) -> list:
+        """District names along the district axis of `state(...)` views."""
+        return self.districts[self.state_slices[state]]
+
+    # -------- totals -------- #
+
+    def state_totals(self, metric: str) -> np.ndarray:
+        """(states, months) sums of a metric, one reduction per state block."""
+        starts = [s.start for s in self.state_slices.values()]
+        values = np.nan_to_num(self.values[self.metric_index[metric]])
+        return np.add.reduceat(values, starts, axis=0) if starts else values[:0]
+
+    def national(self, metric: str) -> np.ndarray:
+        """(months,) national sum of a metric."""
+        return np.nansum(self.values[self.metric_index[metric]], axis=0)
+
+    # -------- long form -------- #
+
+    def frame(self, state: Optional[str] = None, metrics: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Long state / district_clean / month table of the present cells.
+
+        Rows come out sorted by state, district and month, as in the
+        merged table; `state` limits them to one state's block.
+        """
+        block = slice(None) if state is None else self.state_slices[state]
+        metrics = self.metrics if metrics is None else list(metrics)
+        offset = block.start or 0
+
+        d, t = np.nonzero(self.present[block])
+        d = d + offset
+
+        states = pd.Categorical.from_codes(self.district_states[d], categories=self.states)
+        districts, names = pd.factorize(np.asarray(self.districts, dtype=object)[d], sort=True)
+        out = {
+            "state": states,
+            "district_clean": pd.Categorical.from_codes(districts, categories=names),
+            "month": (t + self.month_start).astype(MONTH_DTYPE),
+        }
+        for m in metrics:
+            out[m] = self.values[self.metric_index[m], d, t]
+        return pd.DataFrame(out)
+
+
+# ---------------- BUILD ---------------- #
+
+def _is_metric(s: pd.Series) -> bool:
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return True
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in NUMERIC_KINDS
+
+
+def _default_metrics(df: pd.DataFrame) -> list:
+    """Numeric and boolean columns other than the keys."""
+    return [c for c in df.columns if c not in MERGE_KEYS and _is_metric(df[c])]
+
+
+def _metric_values(s: pd.Series) -> np.ndarray:
+    if s.dtype == object:
+        s = pd.to_numeric(s, errors="coerce")
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _location_codes(column: pd.Series) -> tuple:
+    """(codes, sorted values) of a location column; categoricals keep their codes."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy().astype(np.int64), column.cat.categories
+    codes, values = pd.factorize(column, sort=True)
+    return codes.astype(np.int64), values
+
+
+def build_cube(df: pd.DataFrame, metrics: Optional[Sequence[str]] = None,
+               dtype: str = CUBE_DTYPE) -> DistrictCube:
+    """Scatter a merged monthly table (one row per key) into a `DistrictCube`.
+
+    The month axis spans every month from the first to the last month in
+    `df`; rows with a missing state, district or month are left out.
+    """
+    metrics = _default_metrics(df) if metrics is None else list(metrics)
+    state_col, district_col, month_col = MERGE_KEYS
+
+    month = df[month_col].to_numpy().astype(np.int64)
+    keep = (month != MONTH_NA) & df[state_col].notna().to_numpy() & df[district_col].notna().to_numpy()
+    if not keep.all():
+        df, month = df[keep], month[keep]
+
+    # (state, district) pairs -> district positions, ordered by state then name
+    state_codes, state_values = _location_codes(df[state_col])
+    district_codes, district_values = _location_codes(df[district_col])
+    radix = max(len(district_values), 1)
+    pairs, pos = np.unique(state_codes * radix + district_codes, return_inverse=True)
+    pair_states = pairs // radix
+    pair_districts = pairs % radix
+
+    # compact the state axis to the states that have districts
+    used_states, district_states = np.unique(pair_states, return_inverse=True)
+    states = [str(s) for s in state_values.take(used_states)]
+    districts = [str(d) for d in district_values.take(pair_districts)]
+
+    month_start = int(month.min()) if len(month) else 0
+    n_months = int(month.max()) - month_start + 1 if len(month) else 0
+    t = month - month_start
+
+    present = np.zeros((len(pairs), n_months), dtype=bool)
+    present[pos, t] = True
+    if int(present.sum()) != len(pos):
+        raise ValueError(f"Table has more than one row per {MERGE_KEYS} key")
+
+    values = np.full((len(metrics), len(pairs), n_months), np.nan, dtype=dtype)
+    for i, m in enumerate(metrics):
+        values[i, pos, t] = _metric_values(df[m])
+
+    return DistrictCube(values, present, metrics, states, district_states, districts, month_start)
+
+
+# ---------------- PERSISTENCE ---------------- #
+
+def save_cube(cube: DistrictCube, directory=CUBE_DIR) -> Path:
+    """Write the cube as `.npy` arrays plus a JSON index (atomic directory swap)."""
+    directory = Path(directory)
+    tmp = directory.with_name(directory.name + ".tmp")
+    remove_path(tmp)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / VALUES_FILE, np.ascontiguousarray(cube.values), allow_pickle=False)
+    np.save(tmp / PRESENT_FILE, np.ascontiguousarray(cube.present), allow_pickle=False)
+    meta = {
+        "version": CUBE_VERSION,
+        "metrics": cube.metrics,
+        "states": cube.states,
+        "district_states": cube.district_states.tolist(),
+        "districts": cube.districts,
+        "month_start": cube.month_start,
+        "months": month_labels(pd.Series(cube.months)).tolist(),
+    }
+    with open(tmp / META_FILE, "w") as f:
+        json.dump(meta, f)
+
+    remove_path(directory)
+    tmp.rename(directory)
+    return directory
+
+
+def load_cube(directory=CUBE_DIR, mmap: bool = True, source=None) -> Optional[DistrictCube]:
+    """Open a saved cube; the arrays are memory-mapped (read-only) by default.
+
+    Returns None when no cube of the current layout version is there, or
+    when the `source` table it was built from was rewritten after it.
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / META_FILE) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CUBE_VERSION:
+        return None
+    if source is not None:
+        written = table_mtime(source)
+        if written is not None and os.path.getmtime(directory / META_FILE) < written:
+            # the table was regenerated without the cube: it is stale
+            return None
+
+    mode = "r" if mmap else None
+    values = np.load(directory / VALUES_FILE, mmap_mode=mode, allow_pickle=False)
+    present = np.load(directory / PRESENT_FILE, mmap_mode=mode, allow_pickle=False)
+    return DistrictCube(
+        values, present, meta["metrics"], meta["states"],
+        meta["district_states"], meta["districts"], meta["month_start"]
+    )
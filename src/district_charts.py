@@ -1,8 +1,15 @@
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import shutil
 from pathlib import Path
 
+# Allow running as `python src/district_charts.py` as well as importing
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.storage import read_table, table_exists
+
 
 # ---------------- PATHS ---------------- #
 
@@ -28,11 +35,11 @@ def generate_charts_for_dataset(source_name: str):
     
     # Load normalized data
     data_file = Path(f"outputs/after/{source_name}_districts_normalized.csv")
-    if not data_file.exists():
+    if not table_exists(data_file):
         print(f"⚠️  Data file not found: {data_file}")
         return
     
-    df = pd.read_csv(data_file)
+    df = read_table(data_file, columns=["state", "district", "district_final", "match_type"])
     
     # Create subdirectory for this dataset
     dataset_charts_dir = CHART_OUTPUT_DIR / source_name
@@ -61,9 +68,10 @@ def generate_charts_for_dataset(source_name: str):
 
     # Chart 2: Match type distribution
     match_counts = df["match_type"].value_counts()
+    match_counts = match_counts[match_counts > 0]
 
     plt.figure(figsize=(10, 6))
-    colors = ['#2ECC71', '#3498DB', '#F39C12', '#E74C3C']
+    colors = ['#2ECC71', '#3498DB', '#F39C12', '#E74C3C', '#9B59B6']
     bars = plt.bar(match_counts.index, match_counts.values, color=colors[:len(match_counts)], alpha=0.8)
     plt.title(f"{source_name.title()}: District Match Type Distribution", fontsize=14, fontweight='bold')
     plt.ylabel("Number of Records", fontsize=12)
@@ -82,6 +90,7 @@ def generate_charts_for_dataset(source_name: str):
     unmatched = (
         df[df["match_type"] == "unmatched"]["district"]
         .value_counts()
+        .loc[lambda c: c > 0]
         .head(10)
     )
 
@@ -98,7 +107,7 @@ def generate_charts_for_dataset(source_name: str):
     # Chart 4: State-wise unmatched count
     state_unmatched = (
         df[df["match_type"] == "unmatched"]
-        .groupby("state")
+        .groupby("state", observed=True)
         .size()
         .sort_values(ascending=False)
         .head(10)
@@ -115,7 +124,7 @@ def generate_charts_for_dataset(source_name: str):
         print(f"✅ Chart 4: Top states with unmatched districts")
 
     # Chart 5: State-wise before vs after district normalization
-    state_before_after = df.groupby("state").apply(
+    state_before_after = df.groupby("state", observed=True).apply(
         lambda x: pd.Series({
             "before": x["district"].nunique(),
             "after": x["district_final"].nunique()
@@ -153,6 +162,7 @@ def generate_charts_for_dataset(source_name: str):
     print(f"   Exact Matches: {(df['match_type']=='exact').sum():,}")
     print(f"   Renamed: {(df['match_type']=='renamed').sum():,}")
     print(f"   Fuzzy Matches: {(df['match_type']=='fuzzy').sum():,}")
+    print(f"   National Matches: {(df['match_type']=='national').sum():,}")
     print(f"   Unmatched: {(df['match_type']=='unmatched').sum():,}")
     print(f"   Match Success Rate: {((len(df) - (df['match_type']=='unmatched').sum()) / len(df) * 100):.1f}%")
 
@@ -1,17 +1,25 @@
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from src.quality import QualitySnapshot
+
 
 def before_after_district_count(before_df, after_df, state):
     """
     State-wise district count before vs after normalization
+
+    `before_df` is the `QualitySnapshot` taken before normalization (or,
+    as before, the un-normalized frame itself).
     """
     state = state.upper()
 
-    b = before_df[before_df["state"].str.upper() == state]
     a = after_df[after_df["state"].str.upper() == state]
 
-    before_count = b["district"].nunique()
+    if isinstance(before_df, QualitySnapshot):
+        before_count = before_df.district_count(state)
+    else:
+        b = before_df[before_df["state"].str.upper() == state]
+        before_count = b["district"].nunique()
     # Count only valid, normalized districts after cleaning
     after_count = a.loc[a["is_valid_district"], "district_clean"].nunique()
 
@@ -33,9 +41,15 @@ def before_after_district_count(before_df, after_df, state):
 def invalid_districts_chart(df):
     """
     Bar chart: most frequent invalid district names
+
+    Takes the normalized frame or a `QualitySnapshot` with its invalid
+    names recorded.
     """
-    invalid = df[~df["is_valid_district"]]
-    counts = invalid["district"].value_counts().head(10)
+    if isinstance(df, QualitySnapshot):
+        counts = df.invalid_names(top=10)
+    else:
+        invalid = df[~df["is_valid_district"]]
+        counts = invalid["district"].value_counts().head(10)
 
     if counts.empty:
         return
@@ -0,0 +1,129 @@
+import csv
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import psutil
+    _HAS_PSUTIL = True
+except Exception:
+    _HAS_PSUTIL = False
+
+
+# ---------------- EXECUTION MODE ---------------- #
+#
+# Ownership contract
+# ------------------
+# Every pipeline stage (validation, standardize_*, normalization,
+# aggregate_monthly, compute_risk, simple_forecast, recommend_actions) takes
+# a frame and returns a frame. It obtains the frame it modifies through
+# `working_copy`:
+#
+# * default ("copy") mode: a full deep copy, as before. The caller's frame
+#   is never touched and may be used freely afterwards.
+# * in-place mode: no deep copy. With pandas copy-on-write (pandas >= 2,
+#   always on in pandas 3) the stage gets a shallow copy whose columns are
+#   copied lazily only if the stage overwrites them in place, so the
+#   caller's frame still never changes. Without copy-on-write the stage
+#   works on the caller's frame itself: ownership passes to the stage and
+#   the caller must only use the returned frame from then on.
+#
+# Stages only add or replace whole columns, so in practice a pipeline run
+# in in-place mode holds one working frame per stream.
+
+INPLACE = False
+
+
+def _enable_copy_on_write() -> bool:
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        pd.set_option("mode.copy_on_write", True)
+        return True
+    except Exception:
+        return False
+
+
+_COPY_ON_WRITE = False
+
+
+def set_inplace(enabled: bool = True) -> None:
+    """Switch the process to in-place (copy-free) execution, or back."""
+    global INPLACE, _COPY_ON_WRITE
+    INPLACE = bool(enabled)
+    if INPLACE:
+        _COPY_ON_WRITE = _enable_copy_on_write()
+
+
+def working_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame a stage may modify (see the ownership contract above)."""
+    if not INPLACE:
+        return df.copy()
+    return df.copy(deep=False) if _COPY_ON_WRITE else df
+
+
+# ---------------- MEMORY REPORT ---------------- #
+
+def current_rss_mb() -> float:
+    """Resident set size of this process right now."""
+    if _HAS_PSUTIL:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        return float("nan")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+class MemoryReport:
+    """Current / peak RSS recorded after each pipeline stage."""
+
+    __slots__ = ("mode", "rows", "_start")
+
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode or ("inplace" if INPLACE else "copy")
+        self.rows: List[dict] = []
+        self._start = time.perf_counter()
+        self.checkpoint("start")
+
+    def checkpoint(self, stage: str) -> None:
+        self.rows.append({
+            "mode": self.mode,
+            "stage": stage,
+            "seconds": round(time.perf_counter() - self._start, 2),
+            "rss_mb": round(current_rss_mb(), 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+
+    def print(self) -> None:
+        print(f"\n🧠 Memory report ({self.mode} mode)")
+        for row in self.rows:
+            print(
+                f"  {row['stage']:<24} rss {row['rss_mb']:>9.1f} MB   "
+                f"peak {row['peak_rss_mb']:>9.1f} MB   {row['seconds']:>7.2f}s"
+            )
+
+    def save(self, path) -> Path:
+        """Append the rows to a CSV (created with a header if new)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        new = not path.exists()
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0]))
+            if new:
+                writer.writeheader()
+            writer.writerows(self.rows)
+        return path
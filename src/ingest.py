@@ -1,27 +1,454 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict
 
+# Allow running as a script as well as importing
+if __package__ in (None, ""):
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.manifest import diff_manifest, load_manifest, save_manifest
+from src.parsing import DATE_FORMATS, parse_date, parse_dates
+from src.standardize import STANDARDIZERS, canonical_name, source_columns
+from src.storage import read_table, remove_table, table_exists, write_columnar
+
+
+# ---------------- SCHEMA ---------------- #
+
+# dtype of every raw column we read; columns not listed here (and not
+# age-like) are skipped by `usecols`. `date` is read as a category and parsed
+# once per distinct value (see src/parsing.py). Counts are int32; a file with missing or
+# non-numeric counts gets nullable Int32 for those columns instead.
+_LOCATION_DTYPES = {
+    "date": "category",
+    "state": "category",
+    "district": "category",
+    "pincode": "int32",
+}
+
+# dtype of the declared count columns (every spelling in the standardize
+# variant table)
+COUNT_DTYPE = "int32"
+
+STREAM_SCHEMAS = {
+    stream: {**_LOCATION_DTYPES, **{c: COUNT_DTYPE for c in source_columns(stream)}}
+    for stream in STANDARDIZERS
+}
+
+# dtype for age-like columns that are not declared in the schema
+AGE_DTYPE = "int32"
+
+# dtype of count columns that contain missing / invalid values
+NULLABLE_COUNT_DTYPE = "Int32"
+
+
+def _is_age_column(col: str) -> bool:
+    return "age" in col.lower()
+
+
+def _schema_dtypes(header, schema: Dict[str, str]) -> Dict[str, str]:
+    """Declared dtypes of the columns of `header` that should be read.
+
+    Header names are matched after `canonical_name` (case, spaces and
+    punctuation ignored), as standardize matches them, so a spelling added
+    to the variant table is read whatever its casing in the file.
+    """
+    canonical = {}
+    for name, dtype in schema.items():
+        canonical.setdefault(canonical_name(name), dtype)
+
+    dtypes = {}
+    for c in header:
+        dtype = schema.get(c, canonical.get(canonical_name(c)))
+        if dtype is None and _is_age_column(c):
+            dtype = AGE_DTYPE
+        if dtype is not None:
+            dtypes[c] = dtype
+    return dtypes
+
+
+# Concurrent shard reads when a stream is a list of files; the pandas C
+# parser releases the GIL, so threads are the default
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+# Rows per chunk when state/date filters are pushed into the read
+PUSHDOWN_CHUNK_ROWS = 200_000
+
+# Default rows per batch of `iter_uidai_batches`
+BATCH_ROWS = 250_000
+
+# Per-shard summaries (states present, date range) used to skip shards
+# that cannot match a filter
+SHARD_INDEX_PATH = Path("outputs/cache/ingest_shard_index.json")
+SHARD_INDEX_VERSION = 1
+
+# Validated, typed streams cached in binary form, keyed on the content of
+# their input files and the validation code; bump the version when the
+# meaning of a cached frame changes without a code change in this module
+INGEST_CACHE_DIR = Path("outputs/cache/ingest")
+INGEST_CACHE_VERSION = 1
+
+
+# ---------------- READING ---------------- #
+
+def _read_csv(fp: Path, dtypes: Dict[str, str],
+              row_filter: Optional["RowFilter"] = None) -> Tuple[pd.DataFrame, Optional[Dict]]:
+    """`read_csv` of the `dtypes` columns; with a filter, a chunked read.
+
+    Chunks are filtered as they are read, so rows outside the filter are
+    never held together. Returns the frame and, for filtered reads, the
+    summary of the whole file (see `_shard_summary`).
+    """
+    if not row_filter:
+        return pd.read_csv(fp, usecols=list(dtypes), dtype=dtypes), None
+
+    kept, summaries = [], []
+    reader = pd.read_csv(fp, usecols=list(dtypes), dtype=dtypes, chunksize=PUSHDOWN_CHUNK_ROWS)
+    for chunk in reader:
+        summaries.append(_shard_summary(chunk))
+        kept.append(chunk[row_filter.mask(chunk)])
+
+    if not kept:
+        return pd.read_csv(fp, usecols=list(dtypes), dtype=dtypes, nrows=0), _combine_summaries([])
+    return _concat_typed(kept), _combine_summaries(summaries)
+
+
+def _read_typed(fp: Path, key: str,
+                row_filter: Optional["RowFilter"] = None) -> Tuple[pd.DataFrame, Optional[Dict]]:
+    """Read one raw CSV with the declared schema of stream `key`.
+
+    Only schema columns are parsed. Count columns are read straight into
+    int32; if a file holds missing or non-numeric counts the typed read
+    fails and the counts are re-read untyped and coerced to nullable Int32
+    (NA where invalid), which `_validate_df` then reports. Rows outside
+    `row_filter` are dropped chunk by chunk, before validation.
+    """
+    header = pd.read_csv(fp, nrows=0).columns
+    dtypes = _schema_dtypes(header, STREAM_SCHEMAS[key])
+
+    try:
+        return _read_csv(fp, dtypes, row_filter)
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    numeric = [c for c, t in dtypes.items() if t != "category"]
+    df, summary = _read_csv(
+        fp,
+        {c: t for c, t in dtypes.items() if t == "category"} | {c: object for c in numeric},
+        row_filter
+    )
+    return _coerce_counts(df, numeric), summary
+
+
+def _coerce_counts(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Coerce untyped count columns to nullable Int32 (NA where invalid)."""
+    for c in columns:
+        values = pd.to_numeric(df[c], errors="coerce")
+        # fractional or out-of-range counts are invalid as well
+        values = values.where((values % 1 == 0) & values.abs().lt(2 ** 31))
+        df[c] = values.astype(NULLABLE_COUNT_DTYPE)
+    return df
+
+
+def _iter_typed(fp: Path, key: str, batch_rows: int):
+    """Chunks of one raw CSV with the schema of stream `key`.
+
+    Counts are inferred per chunk and coerced, since a chunked read cannot
+    fall back to an untyped re-read halfway through a file.
+    """
+    header = pd.read_csv(fp, nrows=0).columns
+    dtypes = _schema_dtypes(header, STREAM_SCHEMAS[key])
+    numeric = [c for c, t in dtypes.items() if t != "category"]
+
+    reader = pd.read_csv(
+        fp,
+        usecols=list(dtypes),
+        dtype={c: t for c, t in dtypes.items() if t == "category"},
+        chunksize=batch_rows
+    )
+    for chunk in reader:
+        yield _coerce_counts(chunk, numeric)
+
+
+def _compact_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Nullable count columns without missing values become plain int32."""
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.Int32Dtype) and not df[c].hasnans:
+            df[c] = df[c].to_numpy(dtype="int32")
+    return df
+
+
+def _concat_typed(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate shards, keeping categorical columns categorical.
+
+    `pd.concat` falls back to object dtype when shards have different
+    categories, so every categorical column is first widened to the union
+    of the shards' categories.
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    cat_cols = {
+        c for f in frames for c in f.columns
+        if isinstance(f[c].dtype, pd.CategoricalDtype)
+    }
+    for c in cat_cols:
+        parts = [f[c] for f in frames if c in f.columns]
+        categories = union_categoricals(parts, ignore_order=True).categories
+        frames = [
+            f.assign(**{c: f[c].cat.set_categories(categories)}) if c in f.columns else f
+            for f in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------- FILTER PUSHDOWN ---------------- #
+
+def _category_hits(s: pd.Series, func) -> np.ndarray:
+    """Row mask of a categorical column from a predicate on its categories."""
+    hits = np.asarray(func(s.cat.categories), dtype=bool)
+    # code -1 (missing) never matches
+    return np.append(hits, False)[s.cat.codes.to_numpy()]
+
+
+class RowFilter:
+    """State / date-range predicate pushed down into shard reads.
+
+    `state` is compared stripped and case-insensitively; `start` / `end`
+    are inclusive Timestamps. Unset bounds do not filter.
+    """
+
+    __slots__ = ("state", "start", "end")
+
+    def __init__(self, state: Optional[str] = None,
+                 start: Optional[pd.Timestamp] = None,
+                 end: Optional[pd.Timestamp] = None):
+        self.state = state.strip().upper() if state else None
+        self.start = start
+        self.end = end
+
+    def __bool__(self) -> bool:
+        return self.state is not None or self.start is not None or self.end is not None
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Rows of a raw (typed, unvalidated) chunk that pass the filter."""
+        mask = np.ones(len(df), dtype=bool)
+
+        if self.state is not None and "state" in df.columns:
+            mask &= _category_hits(
+                df["state"], lambda c: c.astype(str).str.strip().str.upper() == self.state
+            )
+
+        if (self.start is not None or self.end is not None) and "date" in df.columns:
+            dates, _ = _safe_parse_date(df["date"])
+            if self.start is not None:
+                mask &= (dates >= self.start).to_numpy()
+            if self.end is not None:
+                mask &= (dates <= self.end).to_numpy()
+
+        return mask
+
+    def may_match(self, summary: Optional[Dict]) -> bool:
+        """False only if a shard's summary proves no row can pass."""
+        if not summary:
+            return True
+        if self.state is not None and summary.get("states") is not None:
+            if self.state not in summary["states"]:
+                return False
+        if summary.get("min_date") is None:
+            # no parsable date: a date filter drops every row
+            return self.start is None and self.end is None
+        if self.start is not None and pd.Timestamp(summary["max_date"]) < self.start:
+            return False
+        if self.end is not None and pd.Timestamp(summary["min_date"]) > self.end:
+            return False
+        return True
+
+
+def _shard_summary(df: pd.DataFrame) -> Dict:
+    """States present and date range of a raw or validated frame."""
+    summary = {"states": None, "min_date": None, "max_date": None}
+
+    if "state" in df.columns:
+        s = df["state"]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.cat.remove_unused_categories().cat.categories.to_series()
+        summary["states"] = sorted(set(s.dropna().astype(str).str.strip().str.upper()))
+
+    if "date" in df.columns:
+        dates = df["date"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates, _ = _safe_parse_date(dates)
+        if dates.notna().any():
+            summary["min_date"] = dates.min().isoformat()
+            summary["max_date"] = dates.max().isoformat()
+
+    return summary
+
+
+def _combine_summaries(summaries: List[Dict]) -> Dict:
+    states = [s["states"] for s in summaries]
+    mins = [s["min_date"] for s in summaries if s["min_date"] is not None]
+    maxs = [s["max_date"] for s in summaries if s["max_date"] is not None]
+    return {
+        "states": None if any(s is None for s in states) else sorted(set().union(*states)),
+        "min_date": min(mins, key=pd.Timestamp) if mins else None,
+        "max_date": max(maxs, key=pd.Timestamp) if maxs else None,
+    }
+
+
+def load_shard_index(path: Path = SHARD_INDEX_PATH) -> Dict:
+    index = load_manifest(path)
+    if index.get("fingerprint") != SHARD_INDEX_VERSION:
+        return {"fingerprint": SHARD_INDEX_VERSION, "files": {}}
+    return index
+
+
+def _indexed_summary(index: Dict, fp: str) -> Optional[Dict]:
+    """Summary of `fp` if the index entry still matches its size and mtime."""
+    entry = index["files"].get(str(Path(fp).resolve()))
+    if entry is None:
+        return None
+    st = os.stat(fp)
+    if entry["size"] != st.st_size or entry["mtime"] != st.st_mtime:
+        return None
+    return entry["summary"]
+
+
+def _record_summary(index: Dict, fp: str, summary: Dict) -> None:
+    st = os.stat(fp)
+    index["files"][str(Path(fp).resolve())] = {
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "summary": summary,
+    }
+
+
+# ---------------- INGEST CACHE ---------------- #
+
+def _validation_fingerprint() -> str:
+    """Hash of the code and schema that shape a validated frame."""
+    h = hashlib.sha256()
+    h.update(f"v{INGEST_CACHE_VERSION}".encode())
+    for module in (__file__, Path(__file__).with_name("parsing.py")):
+        h.update(Path(module).read_bytes())
+    h.update(json.dumps(STREAM_SCHEMAS, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _stream_cache_key(key: str, files: List[str], hashes: Dict) -> str:
+    """Content address of stream `key`: its files' hashes + validation code."""
+    h = hashlib.sha256()
+    h.update(key.encode())
+    h.update(_validation_fingerprint().encode())
+    for fp in files:
+        h.update(hashes["files"][str(fp)]["sha256"].encode())
+    return h.hexdigest()
+
+
+def _hash_inputs(files: List[str], hashes: Dict) -> None:
+    """Refresh `hashes` for `files`, rehashing only files whose size/mtime changed."""
+    known = {k: v for k, v in hashes["files"].items() if k in set(files)}
+    _, _, _, entries = diff_manifest({"files": known}, [Path(fp) for fp in files])
+    hashes["files"].update(entries)
+
+
+def _hashes_current(files: List[str], hashes: Dict) -> bool:
+    """True when every file's size/mtime matches its recorded hash (no reads)."""
+    known = hashes["files"]
+    for fp in files:
+        entry = known.get(str(fp))
+        if entry is None or "sha256" not in entry:
+            return False
+        st = os.stat(fp)
+        if entry["size"] != st.st_size or entry["mtime"] != st.st_mtime:
+            return False
+    return True
+
+
+def _has_cached(key: str) -> bool:
+    return any(INGEST_CACHE_DIR.glob(f"{key}-*.issues.json"))
+
+
+def _cache_path(key: str, cache_key: str) -> Path:
+    return INGEST_CACHE_DIR / f"{key}-{cache_key[:24]}.csv"
+
+
+def _load_cached(key: str, cache_key: str) -> Optional[Tuple[pd.DataFrame, List[Dict]]]:
+    path = _cache_path(key, cache_key)
+    issues_path = path.with_suffix(".issues.json")
+    if not table_exists(path) or not issues_path.exists():
+        return None
+    try:
+        df = read_table(path)
+        with open(issues_path) as f:
+            issues = json.load(f)
+    except Exception:
+        return None
+    return df, issues
+
+
+def _save_cached(key: str, cache_key: str, df: pd.DataFrame, issues: List[Dict]) -> None:
+    INGEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _cache_path(key, cache_key)
+
+    # one entry per stream: drop artifacts of older inputs / code
+    for old in INGEST_CACHE_DIR.glob(f"{key}-*.issues.json"):
+        stem = old.name[:-len(".issues.json")]
+        if stem != path.stem:
+            remove_table(INGEST_CACHE_DIR / f"{stem}.csv")
+            old.unlink()
+
+    write_columnar(df, path)
+    with open(path.with_suffix(".issues.json"), "w") as f:
+        json.dump(issues, f)
+
+
+# ---------------- VALIDATION ---------------- #
 
 def _safe_parse_date(series: pd.Series) -> Tuple[pd.Series, List[str]]:
+    """Parse dates once per distinct value with a detected explicit format."""
     issues = []
     try:
-        parsed = pd.to_datetime(series, dayfirst=True, errors="coerce")
-        bad = parsed.isna() & series.notna()
-        if bad.any():
-            issues.append(f"{bad.sum()} unparsable dates")
+        parsed, bad = parse_dates(series, DATE_FORMATS)
+        if bad:
+            issues.append(f"{bad} unparsable dates")
         return parsed, issues
     except Exception as e:
         return pd.Series(pd.NaT, index=series.index), [str(e)]
 
 
+def _strip_categories(s: pd.Series) -> pd.Series:
+    """Strip whitespace from a categorical column's categories (not its rows)."""
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype("category")
+    stripped = s.cat.categories.astype(str).str.strip()
+    if stripped.is_unique:
+        return s.cat.rename_categories(stripped)
+    # stripping merged some categories: re-encode on the stripped labels
+    return pd.Series(
+        pd.Categorical(stripped[s.cat.codes.to_numpy()].where(s.cat.codes.to_numpy() >= 0)),
+        index=s.index,
+        name=s.name
+    )
+
+
 def _validate_df(df: pd.DataFrame, name: str) -> Tuple[pd.DataFrame, List[Dict]]:
-    """Basic validation: required cols, date parsing, numeric age coercion.
+    """Basic validation: required cols, date parsing, missing age counts.
 
-    Returns cleaned df and a list of issue dicts.
+    Expects a frame read with the stream schema (`_read_typed`), so counts
+    are already numeric; the frame is updated in place rather than copied.
+    Returns the df and a list of issue dicts.
     """
     issues = []
-    df = df.copy()
 
     required = ["date", "state", "district"]
     for col in required:
@@ -35,75 +462,222 @@ def _validate_df(df: pd.DataFrame, name: str) -> Tuple[pd.DataFrame, List[Dict]]
         for it in date_issues:
             issues.append({"file": name, "issue": f"date_parse:{it}", "rows": None})
 
-    # coerce age-like columns to numeric
-    age_cols = [c for c in df.columns if "age" in c.lower()]
+    # age-like columns: report missing / non-numeric counts
+    age_cols = [c for c in df.columns if _is_age_column(c)]
     for c in age_cols:
-        before_nonnum = df[c].dtype == object and df[c].str.isnumeric().value_counts().get(False, 0)
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+        if not pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
         nulls = df[c].isna().sum()
         if nulls:
             issues.append({"file": name, "issue": f"non_numeric_age:{c}", "rows": int(nulls)})
 
-    # trim whitespace
+    # trim whitespace (per category, not per row)
     for c in ["state", "district"]:
         if c in df.columns:
-            df[c] = df[c].astype(str).str.strip()
+            df[c] = _strip_categories(df[c])
 
-    return df, issues
+    return _compact_counts(df), issues
+
+
+_DATE_ISSUE = re.compile(r"date_parse:(\d+) unparsable dates")
+
+
+def _merge_issues(issues: List[Dict]) -> List[Dict]:
+    """Combine per-shard validation issues into one entry per stream issue.
+
+    Row counts (and unparsable date counts) are summed, so the report looks
+    the same as if the concatenated stream had been validated in one go.
+    """
+    merged: Dict[Tuple[str, str], Dict] = {}
+    for it in issues:
+        m = _DATE_ISSUE.fullmatch(it["issue"])
+        key = (it["file"], "date_parse" if m else it["issue"])
+        prev = merged.get(key)
+        if prev is None:
+            merged[key] = dict(it)
+        elif m:
+            total = int(_DATE_ISSUE.fullmatch(prev["issue"]).group(1)) + int(m.group(1))
+            prev["issue"] = f"date_parse:{total} unparsable dates"
+        elif it["rows"] is not None:
+            prev["rows"] = (prev["rows"] or 0) + it["rows"]
+    return list(merged.values())
+
+
+def _load_shard(fp: str, key: str,
+                row_filter: Optional[RowFilter] = None) -> Tuple[Optional[pd.DataFrame], List[Dict], Optional[Dict]]:
+    """Read, filter and validate one shard of stream `key` (runs in a worker).
+
+    Returns (df, issues, summary); df is None when the file cannot be read.
+    """
+    try:
+        df, summary = _read_typed(Path(fp), key, row_filter)
+    except Exception as e:
+        return None, [{"file": key, "issue": f"read_error:{fp}:{e}", "rows": None}], None
+
+    df, issues = _validate_df(df, key)
+    if summary is None:
+        summary = _shard_summary(df)
+    return df, issues, summary
+
+
+def _load_shards(files: List, key: str,
+                 workers: int = INGEST_WORKERS,
+                 use_processes: bool = False,
+                 row_filter: Optional[RowFilter] = None,
+                 index: Optional[Dict] = None) -> Tuple[List[pd.DataFrame], List[Dict]]:
+    """Read and validate shards concurrently; frames come back in file order.
+
+    With a `row_filter`, shards whose `index` summary shows they cannot
+    match are skipped without being opened; summaries of the shards that
+    are read are recorded in `index`. Read errors are reported per file;
+    validation issues are merged per stream (see `_merge_issues`).
+    """
+    files = [str(fp) for fp in files if Path(fp).exists()]
+    row_filter = row_filter or RowFilter()
+
+    skipped = []
+    if row_filter and index is not None:
+        skipped = [fp for fp in files if not row_filter.may_match(_indexed_summary(index, fp))]
+        files = [fp for fp in files if fp not in skipped]
+
+    if workers <= 1 or len(files) <= 1:
+        results = [_load_shard(fp, key, row_filter) for fp in files]
+    else:
+        executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor(max_workers=min(workers, len(files))) as ex:
+            results = list(ex.map(_load_shard, files, [key] * len(files), [row_filter] * len(files)))
+
+    frames, read_issues, issues = [], [], []
+    for fp, (df, shard_issues, summary) in zip(files, results):
+        if df is None:
+            read_issues.extend(shard_issues)
+            continue
+        frames.append(df)
+        issues.extend(shard_issues)
+        if index is not None:
+            _record_summary(index, fp, summary)
+
+    if not frames and skipped:
+        # every shard was pruned: an empty frame with the stream's columns
+        header = pd.read_csv(skipped[0], nrows=0).columns
+        dtypes = _schema_dtypes(header, STREAM_SCHEMAS[key])
+        empty = pd.read_csv(skipped[0], usecols=list(dtypes), dtype=dtypes, nrows=0)
+        frames.append(_validate_df(empty, key)[0])
+
+    return frames, read_issues + _merge_issues(issues)
+
+
+# ---------------- PATHS ---------------- #
+
+DEFAULT_PATHS = {
+    "enrol": "data/raw/enrol.csv",
+    "demo": "data/raw/demo_update.csv",
+    "bio": "data/raw/bio_update.csv",
+}
+
+# raw API folders used when a single-file path does not exist
+SHARD_DIRS = {
+    "enrol": "api_data_aadhar_enrolment",
+    "demo": "api_data_aadhar_demographic",
+    "bio": "api_data_aadhar_biometric",
+}
+
+
+def resolve_paths(paths: Optional[Dict] = None) -> Dict:
+    """Input of each stream: a single CSV path or a sorted list of shards."""
+    if paths is None:
+        paths = dict(DEFAULT_PATHS)
+
+    # If single-file paths don't exist, try to find CSVs in raw API folders
+    from glob import glob
+    base = Path("data/raw")
+    for key, folder in SHARD_DIRS.items():
+        if not isinstance(paths[key], list) and not Path(paths[key]).exists():
+            candidates = sorted(glob(str(base / folder / "*.csv")))
+            if candidates:
+                paths[key] = candidates
+    return paths
 
 
 def load_uidai_data(state: Optional[str] = None,
                     start_date: Optional[str] = None,
                     end_date: Optional[str] = None,
-                    paths: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+                    paths: Optional[Dict[str, str]] = None,
+                    workers: int = INGEST_WORKERS,
+                    use_processes: bool = False,
+                    use_cache: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Load enrol, demo, bio datasets with validation and optional filtering.
 
     Args:
         state: optional state name to filter (case-insensitive)
         start_date/end_date: optional date strings (YYYY-MM-DD or dd-mm-YYYY)
+            (filters are applied while reading, before validation, and shards
+            known not to match are skipped via the shard index)
         paths: optional dict with keys 'enrol','demo','bio' for custom file paths
+        workers: concurrent shard readers when a stream is a list of files
+        use_processes: read shards in a process pool instead of threads
+        use_cache: reuse the validated binary copy of a stream whose input
+            files and validation code are unchanged (outputs/cache/ingest);
+            filtered loads read from it when present but never write it,
+            and never hash their inputs (shards they skip stay unread)
+
+    Ingest issues (outputs/reports/ingest_issues.csv) describe the rows that
+    were validated. A filtered load read from the files validates only the
+    rows that pass the filter, so its row counts cover those rows; a
+    filtered load served from the cache reports the issues recorded when
+    the whole stream was cached, i.e. counts for the unfiltered stream.
 
     Returns (enrol, demo, bio)
     """
-    if paths is None:
-        paths = {
-            "enrol": "data/raw/enrol.csv",
-            "demo": "data/raw/demo_update.csv",
-            "bio": "data/raw/bio_update.csv",
-        }
+    paths = resolve_paths(paths)
+
+    # filters are pushed down into the reads
+    row_filter = RowFilter(
+        state=state,
+        start=parse_date(start_date) if start_date else None,
+        end=parse_date(end_date) if end_date else None
+    )
+    shard_index = load_shard_index()
+    input_hashes = load_manifest(INGEST_CACHE_DIR / "input_hashes.json")
 
-    # If single-file paths don't exist, try to find CSVs in raw API folders
-    from glob import glob
-    base = Path("data/raw")
-    if not Path(paths["enrol"]).exists():
-        candidates = sorted(glob(str(base / "api_data_aadhar_enrolment" / "*.csv")))
-        if candidates:
-            paths["enrol"] = candidates
-    if not Path(paths["demo"]).exists():
-        candidates = sorted(glob(str(base / "api_data_aadhar_demographic" / "*.csv")))
-        if candidates:
-            paths["demo"] = candidates
-    if not Path(paths["bio"]).exists():
-        candidates = sorted(glob(str(base / "api_data_aadhar_biometric" / "*.csv")))
-        if candidates:
-            paths["bio"] = candidates
     out_issues = []
     dfs = {}
     for key in ["enrol", "demo", "bio"]:
         p = paths[key]
+
+        cache_key = None
+        if use_cache:
+            files = [str(fp) for fp in (p if isinstance(p, list) else [p]) if Path(fp).exists()]
+            # a filtered load never writes the cache, so it only looks one up
+            # when that costs no reads: a cached copy exists and every input
+            # still has the size/mtime its hash was recorded with
+            if row_filter and not (_has_cached(key) and _hashes_current(files, input_hashes)):
+                files = []
+            if files:
+                _hash_inputs(files, input_hashes)
+                cache_key = _stream_cache_key(key, files, input_hashes)
+                cached = _load_cached(key, cache_key)
+                if cached is not None:
+                    df, issues = cached
+                    if row_filter:
+                        # issues stay those of the whole stream (see docstring)
+                        df = df[row_filter.mask(df)].reset_index(drop=True)
+                    out_issues.extend(issues)
+                    dfs[key] = df
+                    continue
+
         # allow a list of files (concatenate) or single path
         if isinstance(p, list):
-            frames = []
-            for fp in p:
-                fp = Path(fp)
-                if not fp.exists():
-                    continue
-                try:
-                    frames.append(pd.read_csv(fp))
-                except Exception as e:
-                    out_issues.append({"file": key, "issue": f"read_error:{fp}:{e}", "rows": None})
+            frames, issues = _load_shards(
+                p, key,
+                workers=workers,
+                use_processes=use_processes,
+                row_filter=row_filter,
+                index=shard_index
+            )
+            out_issues.extend(issues)
             if frames:
-                df = pd.concat(frames, ignore_index=True)
+                df = _concat_typed(frames)
             else:
                 out_issues.append({"file": key, "issue": "missing_file", "rows": None})
                 dfs[key] = pd.DataFrame()
@@ -115,31 +689,25 @@ def load_uidai_data(state: Optional[str] = None,
                 dfs[key] = pd.DataFrame()
                 continue
             try:
-                df = pd.read_csv(fp)
+                df, _ = _read_typed(fp, key, row_filter)
             except Exception as e:
                 out_issues.append({"file": key, "issue": f"read_error:{e}", "rows": None})
                 dfs[key] = pd.DataFrame()
                 continue
 
-        df, issues = _validate_df(df, key)
-        out_issues.extend(issues)
+            df, issues = _validate_df(df, key)
+            out_issues.extend(issues)
 
-        # optional filtering
-        if state and "state" in df.columns:
-            df = df[df["state"].str.upper() == state.upper()]
-
-        if start_date:
-            sd = pd.to_datetime(start_date, dayfirst=True, errors="coerce")
-            if sd is not pd.NaT and "date" in df.columns:
-                df = df[df["date"] >= sd]
-
-        if end_date:
-            ed = pd.to_datetime(end_date, dayfirst=True, errors="coerce")
-            if ed is not pd.NaT and "date" in df.columns:
-                df = df[df["date"] <= ed]
+        if cache_key is not None and not row_filter:
+            stream_issues = [it for it in out_issues if it["file"] == key]
+            _save_cached(key, cache_key, df, stream_issues)
 
         dfs[key] = df
 
+    save_manifest(shard_index, SHARD_INDEX_PATH)
+    if use_cache:
+        save_manifest(input_hashes, INGEST_CACHE_DIR / "input_hashes.json")
+
     # save issues
     out = Path("outputs/reports")
     out.mkdir(parents=True, exist_ok=True)
@@ -149,3 +717,70 @@ def load_uidai_data(state: Optional[str] = None,
 
     return dfs.get("enrol", pd.DataFrame()), dfs.get("demo", pd.DataFrame()), dfs.get("bio", pd.DataFrame())
 
+
+
+
+# ---------------- BATCH API ---------------- #
+
+def iter_uidai_batches(stream: str,
+                       batch_rows: int = BATCH_ROWS,
+                       state: Optional[str] = None,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       paths: Optional[Dict] = None,
+                       standardize: bool = True,
+                       issues: Optional[List[Dict]] = None):
+    """Yield validated (and standardized) batches of one stream.
+
+    Batches hold at most `batch_rows` rows and never span two input files,
+    so only one batch is in memory at a time. Filters are applied per batch
+    before validation, as in `load_uidai_data`.
+
+    Args:
+        stream: 'enrol', 'demo' or 'bio'
+        batch_rows: maximum rows per batch
+        state/start_date/end_date/paths: as in `load_uidai_data`
+        standardize: apply the stream's `standardize_*` to every batch
+        issues: optional list that receives the stream's ingest issues
+            (same format as ingest_issues.csv) once iteration completes
+    """
+    if stream not in STREAM_SCHEMAS:
+        raise ValueError(f"Unknown stream: {stream}")
+
+    p = resolve_paths(paths)[stream]
+    files = p if isinstance(p, list) else [p]
+    row_filter = RowFilter(
+        state=state,
+        start=parse_date(start_date) if start_date else None,
+        end=parse_date(end_date) if end_date else None
+    )
+
+    read_issues, batch_issues = [], []
+    if not any(Path(fp).exists() for fp in files):
+        read_issues.append({"file": stream, "issue": "missing_file", "rows": None})
+
+    for fp in files:
+        if not Path(fp).exists():
+            continue
+
+        chunks = _iter_typed(Path(fp), stream, batch_rows)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                read_issues.append({"file": stream, "issue": f"read_error:{fp}:{e}", "rows": None})
+                break
+
+            if row_filter:
+                chunk = chunk[row_filter.mask(chunk)]
+                if chunk.empty:
+                    continue
+
+            chunk, chunk_issues = _validate_df(chunk.reset_index(drop=True), stream)
+            batch_issues.extend(chunk_issues)
+            yield STANDARDIZERS[stream](chunk) if standardize else chunk
+
+    if issues is not None:
+        issues.extend(read_issues + _merge_issues(batch_issues))
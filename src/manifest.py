@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+# ---------------- HELPERS ---------------- #
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(path: Path) -> dict:
+    """Read a manifest file; a missing or unreadable one is an empty manifest."""
+    path = Path(path)
+    if not path.exists():
+        return {"fingerprint": None, "files": {}}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"fingerprint": None, "files": {}}
+
+
+def save_manifest(manifest: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ---------------- DIFF ---------------- #
+
+def diff_manifest(manifest: dict, files: List[Path]) -> Tuple[List[str], List[str], List[str], Dict[str, dict]]:
+    """Compare the files on disk with a manifest of (size, mtime, sha256).
+
+    A file whose size and mtime are unchanged is trusted without hashing;
+    otherwise its content hash decides, so a touched but identical shard is
+    not reprocessed.
+
+    Returns (added, changed, removed, entries) where the lists hold paths as
+    strings and `entries` is the up-to-date manifest entry of every current
+    file.
+    """
+    known = manifest.get("files", {})
+    added, changed, entries = [], [], {}
+
+    for fp in files:
+        key = str(fp)
+        st = os.stat(fp)
+        entry = {"size": st.st_size, "mtime": st.st_mtime}
+        old = known.get(key)
+
+        if old and old["size"] == entry["size"] and old["mtime"] == entry["mtime"]:
+            entries[key] = old
+            continue
+
+        entry["sha256"] = file_sha256(fp)
+        entries[key] = entry
+
+        if old is None:
+            added.append(key)
+        elif old.get("sha256") != entry["sha256"]:
+            changed.append(key)
+
+    removed = [key for key in known if key not in entries]
+    return added, changed, removed, entries
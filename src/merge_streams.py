@@ -1,8 +1,45 @@
+import pandas as pd
+
+
+# Join keys of the monthly stream aggregates
+MERGE_KEYS = ["state", "district_clean", "month"]
+
+# Column prefix of each stream in the merged table; columns that already
+# carry their stream's prefix (enrol_total, demo_updates, ...) keep their name
+STREAM_PREFIXES = {
+    "enrol": "enrol_",
+    "demo": "demo_",
+    "bio": "bio_",
+}
+
+
+def _prefixed(column: str, prefix: str) -> str:
+    return column if column.startswith(prefix) else prefix + column
+
+
 def merge_streams(enrol, demo, bio):
-    df = enrol.merge(
-        demo, on=["state", "district_clean", "month"], how="outer"
-    )
-    df = df.merge(
-        bio, on=["state", "district_clean", "month"], how="outer"
-    )
-    return df
+    """Outer-join the monthly streams on state, district and month in one pass.
+
+    Each stream is indexed on the shared keys (registry categoricals and
+    int32 month ordinals) and all of them are aligned by a single
+    `pd.concat(axis=1, join="outer")`, instead of chaining pairwise merges
+    that copy the growing result once per stream. Non-key columns are named
+    with their stream's prefix (`enrol_child_5_17`, `demo_total_count`, ...)
+    instead of pandas' `_x` / `_y` suffixes.
+
+    Rows come out sorted by state, district and month, as with an outer
+    merge. Each stream must have at most one row per key.
+    """
+    indexed = []
+    for (name, prefix), stream in zip(STREAM_PREFIXES.items(), (enrol, demo, bio)):
+        if stream is None or not len(stream.columns):
+            continue
+        stream = stream.set_index(MERGE_KEYS)
+        if not stream.index.is_unique:
+            raise ValueError(f"{name} has more than one row per {MERGE_KEYS} key")
+        indexed.append(stream.rename(columns=lambda c: _prefixed(c, prefix)))
+
+    if not indexed:
+        return None
+    df = pd.concat(indexed, axis=1, join="outer", sort=True)
+    return df.reset_index()
@@ -1,7 +1,26 @@
+import csv
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from rapidfuzz import process, fuzz
 
+# Allow running as `python src/normalize_districts.py` as well as importing
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cleaning_rules import CleaningRules
+from src.execution import working_copy
+from src.manifest import diff_manifest, load_manifest, save_manifest
+from src.registry import UNMATCHED, RegistryIndex, load_registry_index, token_sort
+from src.resolution_cache import ResolutionCache, resolution_fingerprint
+from src.storage import drop_columnar, remove_table, sync_columnar, write_table
+
 
 # ---------------- COLUMN FINDER ---------------- #
 
@@ -27,6 +46,19 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 FUZZY_THRESHOLD = 90
 
+# Worker threads used by rapidfuzz.process.cdist (-1 = all cores)
+FUZZY_WORKERS = -1
+
+# Registry names scored per query when the state itself is unrecognised
+NATIONAL_CANDIDATES = 10
+
+# Memory ceiling (MB) for one in-flight chunk of the streaming runner
+STREAM_MAX_MEMORY_MB = 512
+
+# Peak memory of normalizing a chunk relative to its raw in-memory size
+# (normalized text columns, resolution columns and the casing merge)
+STREAM_MEMORY_FACTOR = 4
+
 # Mapping for renamed/old district names to current official names
 DISTRICT_RENAME_MAP = {
     # Uttar Pradesh
@@ -330,17 +362,16 @@ STATE_RENAME_MAP = {
     "PONDICHERRY": "PUDUCHERRY",
 }
 
+# Raw district values that are data-entry noise rather than place names
+GARBAGE_PATTERNS = [r'^\?$', r'^100000$', r'^5th', r'^IDPL', r'^Dist\s*:',
+                    r'^\d+$', r'^\s*$', r'^[A-Z]{1,2}$']
 
-# ---------------- HELPERS ---------------- #
+# Cleanup, state renames and garbage detection, evaluated per distinct value.
+# District renames stay in `fuzzy_match` since they depend on the row's state.
+RULES = CleaningRules(STATE_RENAME_MAP, GARBAGE_PATTERNS)
 
-def clean_text(s: pd.Series) -> pd.Series:
-    return (
-        s.astype(str)
-         .str.upper()
-         .str.strip()
-         .str.replace(r"\s+", " ", regex=True)
-    )
 
+# ---------------- HELPERS ---------------- #
 
 def build_registry_index(registry: pd.DataFrame) -> dict:
     index = {}
@@ -349,34 +380,255 @@ def build_registry_index(registry: pd.DataFrame) -> dict:
     return index
 
 
+def national_match(district, registry_index, limit=NATIONAL_CANDIDATES):
+    """Match `district` against all states' names for rows with an unknown state.
+
+    The trigram index of the registry narrows the search to `limit`
+    candidates before scoring. Returns (state, match, score) of the best
+    candidate, or None when nothing shares a trigram with the query.
+    """
+    if not isinstance(registry_index, RegistryIndex) or not isinstance(district, str):
+        return None
+
+    rows = registry_index.national_candidates(district, limit)
+    if not len(rows):
+        return None
+
+    match, score, j = process.extractOne(
+        district,
+        registry_index.district_norm[rows].tolist(),
+        scorer=fuzz.token_sort_ratio
+    )
+    return registry_index.state_of(rows[j]), match, score
+
+
 def fuzzy_match(district, state, registry_index):
+    """Resolve one (district, state) pair.
+
+    Returns (match, score, match_type, match_state), as `fuzzy_match_batch`
+    does per pair; `match_state` is `state` except for national matches.
+    """
     # First check if district is in the rename map
     if district in DISTRICT_RENAME_MAP:
         mapped_district = DISTRICT_RENAME_MAP[district]
         candidates = registry_index.get(state)
         if candidates and mapped_district in candidates:
-            return mapped_district, 100, "renamed"
+            return mapped_district, 100, "renamed", state
     
     candidates = registry_index.get(state)
 
     if not candidates:
-        return district, None, "unmatched"
+        # Unknown (usually garbled) state: fall back to a national search
+        national = national_match(district, registry_index)
+        if national is not None and national[2] >= FUZZY_THRESHOLD:
+            match_state, match, score = national
+            return match, score, "national", match_state
+        return district, None, "unmatched", state
 
-    match, score, _ = process.extractOne(
+    best = process.extractOne(
         district,
         candidates,
         scorer=fuzz.token_sort_ratio
-    )
+    ) if isinstance(district, str) else None
+    if best is None:
+        return district, None, "unmatched", state
+    match, score, _ = best
 
     if score >= FUZZY_THRESHOLD:
-        return match, score, "fuzzy"
+        return match, score, "fuzzy", state
+
+    return district, score, "unmatched", state
+
+
+def fuzzy_match_batch(districts, states, registry_index, workers=FUZZY_WORKERS):
+    """Batch equivalent of `fuzzy_match` for many (district, state) pairs.
+
+    Rename-map hits are resolved directly; the remaining names are grouped
+    by state and scored against that state's candidates with a single
+    `process.cdist` call per state, parallelised over `workers` threads.
+    Names whose state is not in the registry go through `national_match`.
+
+    Returns a list of (match, score, match_type, match_state) in input
+    order; `match_state` is the input state except for national matches.
+    """
+    results = [None] * len(districts)
+    by_state = {}
+
+    for i, (district, state) in enumerate(zip(districts, states)):
+        candidates = registry_index.get(state)
+
+        if district in DISTRICT_RENAME_MAP:
+            mapped_district = DISTRICT_RENAME_MAP[district]
+            if candidates and mapped_district in candidates:
+                results[i] = (mapped_district, 100, "renamed", state)
+                continue
+
+        if not candidates:
+            national = national_match(district, registry_index)
+            if national is not None and national[2] >= FUZZY_THRESHOLD:
+                match_state, match, score = national
+                results[i] = (match, score, "national", match_state)
+            else:
+                results[i] = (district, None, "unmatched", state)
+            continue
+
+        if not isinstance(district, str):
+            results[i] = (district, None, "unmatched", state)
+            continue
+
+        by_state.setdefault(state, []).append(i)
+
+    compiled = isinstance(registry_index, RegistryIndex)
+
+    for state, positions in by_state.items():
+        candidates = registry_index[state]
+        queries = [districts[i] for i in positions]
+
+        if compiled:
+            # token_sort_ratio == ratio on token-sorted strings; the registry
+            # side is pre-sorted once in the index
+            scores = process.cdist(
+                [token_sort(q) for q in queries],
+                registry_index.sorted_candidates(state),
+                scorer=fuzz.ratio,
+                dtype=np.float64,
+                workers=workers
+            )
+        else:
+            scores = process.cdist(
+                queries,
+                candidates,
+                scorer=fuzz.token_sort_ratio,
+                dtype=np.float64,
+                workers=workers
+            )
+        best = scores.argmax(axis=1)
+
+        for i, query, j, row in zip(positions, queries, best, scores):
+            score = float(row[j])
+            if score >= FUZZY_THRESHOLD:
+                results[i] = (candidates[j], score, "fuzzy", state)
+            else:
+                results[i] = (query, score, "unmatched", state)
+
+    return results
+
+
+def open_resolution_cache() -> ResolutionCache:
+    """Open the on-disk resolution cache for the current registry and maps."""
+    fingerprint = resolution_fingerprint(
+        REGISTRY_PATH,
+        DISTRICT_RENAME_MAP,
+        STATE_RENAME_MAP,
+        FUZZY_THRESHOLD
+    )
+    return ResolutionCache(fingerprint)
+
+
+def resolve_district_pairs(state_norm: pd.Series,
+                           district_norm: pd.Series,
+                           registry_index: RegistryIndex,
+                           exact_pairs,
+                           cache: ResolutionCache = None,
+                           workers: int = FUZZY_WORKERS) -> pd.DataFrame:
+    """Resolve every distinct (state, district) pair once and broadcast back.
+
+    Both columns are factorized to integer codes, the codes are combined
+    into a single pair code and only the unique pairs go through the exact /
+    renamed / fuzzy / unmatched resolution. The per-pair results are then
+    gathered back to row level with the pair codes.
+
+    When a `cache` is given, non-exact pairs are looked up there first and
+    newly fuzzed pairs are written back to it. Whatever is left is scored in
+    one batch by `fuzzy_match_batch`.
+
+    Returns a frame aligned with the input index holding
+    `district_final_norm`, `match_type`, `match_score` and
+    `state_final_norm` (the registry state a national match resolved to).
+    """
+    state_codes, state_uniques = pd.factorize(state_norm, use_na_sentinel=False)
+    district_codes, district_uniques = pd.factorize(district_norm, use_na_sentinel=False)
+
+    pair_keys = state_codes.astype(np.int64) * len(district_uniques) + district_codes
+    pair_codes, pair_uniques = pd.factorize(pair_keys)
 
-    return district, score, "unmatched"
+    n_pairs = len(pair_uniques)
+    final = np.empty(n_pairs, dtype=object)
+    match_type = np.empty(n_pairs, dtype=object)
+    match_score = np.full(n_pairs, None, dtype=object)
+    state_final = np.empty(n_pairs, dtype=object)
+    pending = []
+
+    for i, key in enumerate(pair_uniques):
+        state = state_uniques[key // len(district_uniques)]
+        district = district_uniques[key % len(district_uniques)]
+
+        state_final[i] = state
+
+        if (state, district) in exact_pairs:
+            final[i], match_type[i] = district, "exact"
+            continue
+
+        cached = None
+        if cache is not None and isinstance(state, str) and isinstance(district, str):
+            cached = cache.get(state, district)
+        if cached is not None:
+            final[i], match_score[i], match_type[i], state_final[i] = cached
+            continue
+
+        pending.append((i, state, district))
+
+    matches = fuzzy_match_batch(
+        [district for _, _, district in pending],
+        [state for _, state, _ in pending],
+        registry_index,
+        workers=workers
+    )
+
+    new_entries = []
+    for (i, state, district), (matched, score, mtype, match_state) in zip(pending, matches):
+        final[i], match_score[i], match_type[i], state_final[i] = matched, score, mtype, match_state
+        if isinstance(state, str) and isinstance(district, str):
+            new_entries.append((state, district, matched, score, mtype, match_state))
+
+    if cache is not None:
+        cache.put_many(new_entries)
+
+    return pd.DataFrame(
+        {
+            "district_final_norm": final[pair_codes],
+            "match_type": match_type[pair_codes],
+            "match_score": match_score[pair_codes],
+            "state_final_norm": state_final[pair_codes],
+        },
+        index=state_norm.index,
+    )
 
 
 # ---------------- CORE FUNCTION ---------------- #
 
-def normalize_dataframe(df: pd.DataFrame, source_name: str) -> pd.DataFrame:
+def load_district_registry() -> RegistryIndex:
+    """Compiled registry index, shared by every stream in the process."""
+    return load_registry_index(REGISTRY_PATH)
+
+
+def normalize_frame(df: pd.DataFrame,
+                    registry_index: RegistryIndex = None,
+                    engine: str = "unique",
+                    use_cache: bool = True,
+                    workers: int = FUZZY_WORKERS,
+                    cache: ResolutionCache = None) -> pd.DataFrame:
+    """Normalize district names of a raw UIDAI frame against the registry.
+
+    `engine="unique"` resolves each distinct (state, district) pair once and
+    broadcasts the result back to the rows; `engine="rowwise"` keeps the
+    original per-row matching loop. With `use_cache` the unique engine reuses
+    resolutions persisted by earlier runs (see `open_resolution_cache`);
+    `workers` sets the thread count of the batched fuzzy stage. Callers that
+    normalize many frames can pass an already open `cache` to share it.
+    """
+    if engine not in ("unique", "rowwise"):
+        raise ValueError(f"Unknown resolution engine: {engine}")
 
     # Detect columns dynamically
     state_col = find_column(df, ["state", "State", "STATE"])
@@ -385,93 +637,118 @@ def normalize_dataframe(df: pd.DataFrame, source_name: str) -> pd.DataFrame:
         ["district", "District", "DISTRICT", "district_name", "District Name"]
     )
 
-    # Load registry
-    registry = pd.read_csv(REGISTRY_PATH)
-    registry["state_norm"] = clean_text(registry["state"])
-    registry["district_norm"] = clean_text(registry["district"])
+    if registry_index is None:
+        registry_index = load_district_registry()
 
-    registry = registry.drop_duplicates(
-        subset=["state_norm", "district_norm"]
-    )
+    # Normalize raw data (cleanup + state renames on distinct values only)
+    df = working_copy(df)
+    df["state_norm"] = RULES.normalize_states(df[state_col])
+    df["district_norm"] = RULES.normalize_districts(df[district_col])
 
-    registry_index = build_registry_index(registry)
+    # Filter out garbage data before matching so no fuzzy work is spent on
+    # rows that are thrown away; exact registry pairs are never garbage
+    garbage_mask = RULES.garbage_mask(df[district_col])
+    if garbage_mask.any():
+        rows = np.flatnonzero(garbage_mask)
+        official = registry_index.contains_pairs(
+            df["state_norm"].to_numpy()[rows],
+            df["district_norm"].to_numpy()[rows]
+        )
+        garbage_mask[rows[official]] = False
 
-    # Normalize raw data
-    df = df.copy()
-    df["state_norm"] = clean_text(df[state_col])
-    df["district_norm"] = clean_text(df[district_col])
-    
-    # Apply state name mapping
-    df["state_norm"] = df["state_norm"].map(lambda x: STATE_RENAME_MAP.get(x, x))
+    garbage_removed = int(garbage_mask.sum())
+    if garbage_removed > 0:
+        df = df[~garbage_mask]
+        print(f"  🗑️  Removed {garbage_removed} garbage records")
 
-    # Exact match
-    exact_pairs = set(
-        zip(registry["state_norm"], registry["district_norm"])
-    )
+    # Exact match: the index answers `(state, district) in registry_index`
+    exact_pairs = registry_index
 
-    df["match_type"] = "unmatched"
-    df["match_score"] = None
-    df["district_final_norm"] = df["district_norm"]
+    if engine == "unique":
+        owns_cache = cache is None and use_cache
+        if owns_cache:
+            cache = open_resolution_cache()
+        try:
+            resolved = resolve_district_pairs(
+                df["state_norm"],
+                df["district_norm"],
+                registry_index,
+                exact_pairs,
+                cache=cache,
+                workers=workers
+            )
+        finally:
+            if owns_cache:
+                cache.close()
+        df["match_type"] = resolved["match_type"]
+        df["match_score"] = resolved["match_score"]
+        df["district_final_norm"] = resolved["district_final_norm"]
+        df["state_final_norm"] = resolved["state_final_norm"]
+    else:
+        df["match_type"] = "unmatched"
+        df["match_score"] = None
+        df["district_final_norm"] = df["district_norm"]
+        df["state_final_norm"] = df["state_norm"]
 
-    exact_mask = df.apply(
-        lambda r: (r["state_norm"], r["district_norm"]) in exact_pairs,
-        axis=1
-    )
+        exact_mask = df.apply(
+            lambda r: (r["state_norm"], r["district_norm"]) in exact_pairs,
+            axis=1
+        )
 
-    df.loc[exact_mask, "match_type"] = "exact"
+        df.loc[exact_mask, "match_type"] = "exact"
 
-    # Fuzzy match
-    for idx, row in df[~exact_mask].iterrows():
-        matched, score, mtype = fuzzy_match(
-            row["district_norm"],
-            row["state_norm"],
-            registry_index
-        )
+        # Fuzzy match
+        for idx, row in df[~exact_mask].iterrows():
+            matched, score, mtype, matched_state = fuzzy_match(
+                row["district_norm"],
+                row["state_norm"],
+                registry_index
+            )
 
-        df.at[idx, "district_final_norm"] = matched
-        df.at[idx, "match_type"] = mtype
-        df.at[idx, "match_score"] = score
+            df.at[idx, "district_final_norm"] = matched
+            df.at[idx, "state_final_norm"] = matched_state
+            df.at[idx, "match_type"] = mtype
+            df.at[idx, "match_score"] = score
 
-    # Attach official district casing
-    registry_merge = registry[["state_norm", "district_norm", "district"]].copy()
-    registry_merge.rename(columns={"district": "district_official"}, inplace=True)
-    
-    df = df.merge(
-        registry_merge,
-        left_on=["state_norm", "district_final_norm"],
-        right_on=["state_norm", "district_norm"],
-        how="left"
-    )
+    # Attach official district casing: a registry row lookup per pair
+    # instead of a merge, so the frame is not copied once more and no
+    # merge-suffixed (_x / _y) columns are left on it
+    rows = registry_index.pair_ids(df["state_final_norm"], df["district_final_norm"])
+    found = rows >= 0
+    rows = np.where(found, rows, 0)
+
+    df.reset_index(drop=True, inplace=True)
+
+    def registry_column(values: np.ndarray) -> pd.Series:
+        return pd.Series(values).take(rows).where(found).set_axis(df.index)
 
     # ✅ THIS IS THE CRITICAL FIX
     # Use registry district if found, else fallback to raw detected column
-    df["district_final"] = df["district_official"].fillna(df[district_col])
+    official = registry_column(registry_index.district_official)
+    df["district_final"] = official.fillna(df[district_col])
 
-    # Filter out garbage data: Keep only matched records (exact, renamed, fuzzy)
-    # Remove unmatched records that contain corrupted/garbage data
-    df_before_filter = len(df)
-    
-    # Remove records with obviously corrupted district names
-    garbage_patterns = [r'^\?$', r'^100000$', r'^5th', r'^IDPL', r'^Dist\s*:', 
-                       r'^\d+$', r'^\s*$', r'^[A-Z]{1,2}$']
-    
-    import re
-    garbage_regex = '|'.join(garbage_patterns)
-    garbage_mask = df['district_final'].str.contains(garbage_regex, case=False, na=False, regex=True)
-    
-    df = df[~garbage_mask]
-    df_after_filter = len(df)
-    garbage_removed = df_before_filter - df_after_filter
-    
-    if garbage_removed > 0:
-        print(f"  🗑️  Removed {garbage_removed} garbage records")
+    return df
 
-    # Cleanup
-    df.drop(columns=["district_official", "district_norm"], inplace=True, errors="ignore")
+
+def normalize_dataframe(df: pd.DataFrame,
+                        source_name: str,
+                        engine: str = "unique",
+                        use_cache: bool = True,
+                        workers: int = FUZZY_WORKERS,
+                        registry_index: RegistryIndex = None) -> pd.DataFrame:
+    """Normalize a raw UIDAI frame and save it as `<source>_districts_normalized.csv`."""
+    df = normalize_frame(
+        df,
+        registry_index=registry_index,
+        engine=engine,
+        use_cache=use_cache,
+        workers=workers
+    )
 
     # Save output
+    # CSV plus a columnar copy (see src/storage.py)
     out_file = OUTPUT_DIR / f"{source_name}_districts_normalized.csv"
-    df.to_csv(out_file, index=False)
+    write_table(df, out_file)
 
     print(f"✅ Normalized: {source_name}")
     print(df["match_type"].value_counts())
@@ -480,39 +757,479 @@ def normalize_dataframe(df: pd.DataFrame, source_name: str) -> pd.DataFrame:
     return df
 
 
+def apply_district_normalization(df: pd.DataFrame, registry: RegistryIndex) -> pd.DataFrame:
+    """Pipeline entry point: normalize in memory and add `district_clean`.
+
+    `state` and `district_clean` become categoricals with the registry's
+    shared dtypes (`RegistryIndex.location_dtypes`): the official state and
+    district names, with rows that did not resolve in the `UNMATCHED`
+    bucket. Every stream therefore carries identical categories, so
+    groupbys and merges downstream work on the integer codes.
+    `is_valid_district` flags rows resolved to a registry district.
+    """
+    df = normalize_frame(df, registry_index=registry)
+    _, district_dtype = registry.location_dtypes()
+
+    valid = (df["match_type"] != "unmatched").to_numpy()
+    df["is_valid_district"] = valid
+    df["state"] = registry.official_states(df["state_final_norm"])
+    df["district_clean"] = (
+        df["district_final"].where(valid, UNMATCHED).astype(district_dtype)
+    )
+    return df
+
+
+def estimate_chunk_rows(path: Path, max_memory_mb: float, sample_rows: int = 10_000) -> int:
+    """Rows per chunk that keep one normalized chunk under `max_memory_mb`."""
+    sample = pd.read_csv(path, nrows=sample_rows)
+    if sample.empty:
+        return sample_rows
+
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    budget = max_memory_mb * 1024 ** 2 / STREAM_MEMORY_FACTOR
+    return max(1_000, int(budget / bytes_per_row))
+
+
+def _header_width(path: Path) -> int:
+    with open(path, newline="") as f:
+        return len(next(csv.reader(f)))
+
+
+def _widen_csv(path: Path, columns: list, chunk_rows: int) -> None:
+    """Rewrite a CSV whose later rows carry more columns than its header.
+
+    Rows shorter than `columns` are padded with empty values, so every row
+    ends up with the full (union) header.
+    """
+    wide = path.with_suffix(path.suffix + ".wide")
+    header = True
+    for chunk in pd.read_csv(path, header=None, skiprows=1, names=columns,
+                             chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        chunk.to_csv(wide, mode="w" if header else "a", header=header, index=False)
+        header = False
+    if header:
+        pd.DataFrame(columns=columns).to_csv(wide, index=False)
+    wide.replace(path)
+
+
+def normalize_stream(files,
+                     source_name: str,
+                     registry_index: RegistryIndex = None,
+                     max_memory_mb: float = STREAM_MAX_MEMORY_MB,
+                     chunk_rows: int = None,
+                     use_cache: bool = True,
+                     workers: int = FUZZY_WORKERS) -> dict:
+    """Streaming variant of `normalize_dataframe` for large shard sets.
+
+    Shards are read in chunks of `chunk_rows` rows (derived from
+    `max_memory_mb` when not given), each chunk is normalized and appended
+    to `<source>_districts_normalized.csv`, so only one chunk is held in
+    memory. A single resolution cache is shared by all chunks, so a pair is
+    fuzzed at most once per run (and, with `use_cache`, across runs).
+    Shards with differing headers are written with the union of their
+    columns (empty where a shard lacks one), as a `pd.concat` would. No
+    columnar copy is written, since that would load the whole output.
+
+    Returns the match type counts of the whole stream.
+    """
+    files = [Path(f) for f in files]
+    if registry_index is None:
+        registry_index = load_district_registry()
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(files[0], max_memory_mb)
+
+    out_file = OUTPUT_DIR / f"{source_name}_districts_normalized.csv"
+    tmp_file = out_file.with_suffix(".csv.partial")
+
+    cache = open_resolution_cache() if use_cache else ResolutionCache("in-memory", path=":memory:")
+    match_counts = pd.Series(dtype="int64")
+    columns = None
+    mismatched = []
+
+    print(f"  Streaming {len(files)} files in chunks of {chunk_rows:,} rows")
+
+    try:
+        for fp in files:
+            for chunk in pd.read_csv(fp, chunksize=chunk_rows):
+                chunk = normalize_frame(
+                    chunk,
+                    registry_index=registry_index,
+                    workers=workers,
+                    cache=cache
+                )
+
+                if columns is None:
+                    columns = list(chunk.columns)
+                    chunk.to_csv(tmp_file, index=False)
+                else:
+                    if list(chunk.columns) != columns and fp not in mismatched:
+                        mismatched.append(fp)
+                        print(f"⚠️  {fp.name}: header differs from {files[0].name}, "
+                              f"writing the union of columns")
+                    # columns first seen here go last; earlier rows are
+                    # widened with empty values once the stream is done
+                    columns.extend(c for c in chunk.columns if c not in columns)
+                    chunk.reindex(columns=columns).to_csv(
+                        tmp_file, mode="a", header=False, index=False
+                    )
+
+                match_counts = match_counts.add(
+                    chunk["match_type"].value_counts(), fill_value=0
+                )
+    finally:
+        cache.close()
+
+    if columns is None:
+        print(f"⚠️  No rows read for {source_name}")
+        return {}
+
+    if len(columns) > _header_width(tmp_file):
+        _widen_csv(tmp_file, columns, chunk_rows)
+    tmp_file.replace(out_file)
+    # a columnar copy would parse the whole output at once, past the chunk
+    # memory ceiling: the CSV stays the only copy
+    drop_columnar(out_file)
+
+    match_counts = match_counts.astype("int64").sort_values(ascending=False)
+    print(f"✅ Normalized (streaming): {source_name}")
+    print(match_counts)
+    print(f"📁 Output → {out_file}")
+
+    return match_counts.to_dict()
+
+
 # ---------------- RUNNER ---------------- #
 
-if __name__ == "__main__":
+DATASETS = ["api_data_aadhar_biometric", "api_data_aadhar_demographic", "api_data_aadhar_enrolment"]
 
-    # Process all three datasets: biometric, demographic, and enrolment
-    datasets = ["api_data_aadhar_biometric", "api_data_aadhar_demographic", "api_data_aadhar_enrolment"]
-    
-    for dataset_name in datasets:
-        dataset_dir = RAW_DATA_DIR / dataset_name
-        
-        print(f"\n{'='*80}")
-        print(f"Processing: {dataset_name}")
-        print(f"{'='*80}")
-        print("DEBUG: Looking for files in →", dataset_dir)
 
-        files = list(dataset_dir.glob("*.csv"))
+def dataset_files(dataset_name: str) -> list:
+    return sorted((RAW_DATA_DIR / dataset_name).glob("*.csv"))
 
-        print("DEBUG: Files found →", len(files), "files")
 
-        if not files:
-            print(f"⚠️  No CSV files found in {dataset_dir}, skipping...")
-            continue
+def source_name_of(dataset_name: str) -> str:
+    # Use shorter name for output
+    return dataset_name.replace("api_data_aadhar_", "")
+
+
+def normalize_dataset(dataset_name: str,
+                      registry_index: RegistryIndex,
+                      stream: bool = False,
+                      max_memory_mb: float = STREAM_MAX_MEMORY_MB,
+                      chunk_rows: int = None,
+                      workers: int = FUZZY_WORKERS):
+    """Normalize all shards of one raw dataset; returns wall time in seconds."""
+    start = time.perf_counter()
+    dataset_dir = RAW_DATA_DIR / dataset_name
+
+    print(f"\n{'='*80}")
+    print(f"Processing: {dataset_name}")
+    print(f"{'='*80}")
+    print("DEBUG: Looking for files in →", dataset_dir)
+
+    files = dataset_files(dataset_name)
+
+    print("DEBUG: Files found →", len(files), "files")
 
+    if not files:
+        print(f"⚠️  No CSV files found in {dataset_dir}, skipping...")
+        return None
+
+    source_name = source_name_of(dataset_name)
+
+    if stream:
+        normalize_stream(
+            files,
+            source_name=source_name,
+            registry_index=registry_index,
+            max_memory_mb=max_memory_mb,
+            chunk_rows=chunk_rows,
+            workers=workers
+        )
+    else:
         df = pd.concat(
             (pd.read_csv(f) for f in files),
             ignore_index=True
         )
-        
-        # Use shorter name for output
-        source_name = dataset_name.replace("api_data_aadhar_", "")
-        
-        normalize_dataframe(df, source_name=source_name)
-    
+
+        normalize_dataframe(df, source_name=source_name, registry_index=registry_index, workers=workers)
+
+    return time.perf_counter() - start
+
+
+# -------- process pool -------- #
+
+# Registry index handed to each pool worker once, at start-up
+_WORKER_REGISTRY = None
+
+
+def _init_worker(registry_index: RegistryIndex):
+    global _WORKER_REGISTRY
+    _WORKER_REGISTRY = registry_index
+
+
+def _dataset_task(dataset_name: str, options: dict):
+    return normalize_dataset(dataset_name, _WORKER_REGISTRY, **options)
+
+
+def _shard_task(path: Path, part_file: Path, workers: int) -> float:
+    """Normalize one shard into `part_file`; returns the (epoch) time it started."""
+    started = time.time()
+    df = normalize_frame(pd.read_csv(path), registry_index=_WORKER_REGISTRY, workers=workers)
+    df.to_csv(part_file, index=False)
+    return started
+
+
+def _concat_parts(parts: list, out_file: Path, remove: bool = True, append: bool = False,
+                  columnar: bool = True) -> None:
+    """Stitch per-shard CSVs into `out_file`, byte-copying them when the headers agree.
+
+    With `append` the parts are added after the rows already in `out_file`.
+    Parts with differing headers are parsed and concatenated instead. With
+    `columnar` the columnar copy of `out_file` is refreshed afterwards,
+    which parses the whole output; otherwise any columnar copy is dropped.
+    """
+    headers = set()
+    for part in parts:
+        with open(part, "rb") as f:
+            headers.add(f.readline())
+
+    if append:
+        with open(out_file, "rb") as f:
+            headers.add(f.readline())
+
+    if len(headers) > 1:
+        frames = [pd.read_csv(out_file)] if append else []
+        frames.extend(pd.read_csv(p) for p in parts)
+        pd.concat(frames, ignore_index=True).to_csv(out_file, index=False)
+    else:
+        with open(out_file, "ab" if append else "wb") as out:
+            for n, part in enumerate(parts):
+                with open(part, "rb") as f:
+                    if n or append:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+
+    if remove:
+        for part in parts:
+            part.unlink()
+
+    if columnar:
+        sync_columnar(out_file)
+    else:
+        drop_columnar(out_file)
+
+
+# -------- incremental -------- #
+
+def shard_dir_of(source_name: str) -> Path:
+    return OUTPUT_DIR / "shards" / source_name
+
+
+def normalize_dataset_incremental(dataset_name: str,
+                                  registry_index: RegistryIndex,
+                                  workers: int = FUZZY_WORKERS):
+    """Re-normalize only the shards that are new or changed since the last run.
+
+    Every shard's normalized rows are kept under
+    `outputs/after/shards/<source>/` next to a manifest of (size, mtime,
+    sha256) per raw file. New shards are appended to
+    `<source>_districts_normalized.csv`; when a shard changed or disappeared
+    the combined file is re-stitched from the per-shard outputs, which
+    retracts the stale rows without re-normalizing anything else. A change
+    of registry, rename maps or threshold invalidates the whole manifest,
+    and a reset (or first) manifest always rebuilds the combined file.
+    The combined file is kept as CSV only (any columnar copy is dropped),
+    so a run never parses the full history.
+
+    Returns wall time in seconds.
+    """
+    start = time.perf_counter()
+    source_name = source_name_of(dataset_name)
+    files = dataset_files(dataset_name)
+
+    shard_dir = shard_dir_of(source_name)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = shard_dir / "manifest.json"
+    out_file = OUTPUT_DIR / f"{source_name}_districts_normalized.csv"
+
+    fingerprint = resolution_fingerprint(
+        REGISTRY_PATH,
+        DISTRICT_RENAME_MAP,
+        STATE_RENAME_MAP,
+        FUZZY_THRESHOLD
+    )
+    manifest = load_manifest(manifest_path)
+    # the existing output only extends by appending when it was stitched
+    # under this manifest; otherwise every shard is "added" and the
+    # combined file is rebuilt instead of appended to
+    reset = manifest.get("fingerprint") != fingerprint or not manifest.get("files")
+    if manifest.get("fingerprint") != fingerprint:
+        manifest = {"fingerprint": fingerprint, "files": {}}
+
+    added, changed, removed, entries = diff_manifest(manifest, files)
+    print(f"📒 {source_name}: {len(added)} new, {len(changed)} changed, "
+          f"{len(removed)} removed, {len(entries) - len(added) - len(changed)} unchanged shards")
+
+    def part_of(key):
+        return shard_dir / f"{Path(key).stem}.csv"
+
+    new_parts = []
+    with open_resolution_cache() as cache:
+        for key in added + changed:
+            df = normalize_frame(
+                pd.read_csv(key),
+                registry_index=registry_index,
+                workers=workers,
+                cache=cache
+            )
+            df.to_csv(part_of(key), index=False)
+            new_parts.append(part_of(key))
+
+    for key in removed:
+        part_of(key).unlink(missing_ok=True)
+
+    if reset or changed or removed or not out_file.exists():
+        parts = [part_of(key) for key in sorted(entries)]
+        if parts:
+            _concat_parts(parts, out_file, remove=False, columnar=False)
+        else:
+            remove_table(out_file)
+    elif new_parts:
+        _concat_parts(new_parts, out_file, remove=False, append=True, columnar=False)
+
+    manifest["files"] = entries
+    save_manifest(manifest, manifest_path)
+
+    print(f"📁 Output → {out_file}")
+    return time.perf_counter() - start
+
+
+def normalize_datasets_parallel(dataset_names: list,
+                                registry_index: RegistryIndex,
+                                processes: int,
+                                per_shard: bool = False,
+                                **options) -> dict:
+    """Normalize several datasets concurrently in a process pool.
+
+    The compiled registry index is pickled to each worker once through the
+    pool initializer, so no worker re-reads the registry CSV. With
+    `per_shard` every shard is its own task and the per-shard outputs are
+    stitched into `<source>_districts_normalized.csv` afterwards (the
+    `stream` options do not apply in that mode). The cdist thread count is
+    split across processes unless `workers` is given.
+
+    Returns {dataset_name: wall seconds}; per shard, a dataset's time runs
+    from its first shard starting in a worker to its output being stitched.
+    """
+    options.setdefault("workers", max(1, (os.cpu_count() or 1) // processes))
+    timings = {}
+
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_init_worker,
+                             initargs=(registry_index,)) as pool:
+        if not per_shard:
+            futures = {pool.submit(_dataset_task, name, options): name for name in dataset_names}
+            for fut in as_completed(futures):
+                timings[futures[fut]] = fut.result()
+            return timings
+
+        parts = {}
+        pending = {}
+        first_start = {}
+        futures = {}
+        for name in dataset_names:
+            files = dataset_files(name)
+            if not files:
+                print(f"⚠️  No CSV files found for {name}, skipping...")
+                timings[name] = None
+                continue
+            parts[name] = [
+                OUTPUT_DIR / f"{source_name_of(name)}_districts_normalized.part{n:05d}.csv"
+                for n in range(len(files))
+            ]
+            pending[name] = len(files)
+            for fp, part in zip(files, parts[name]):
+                futures[pool.submit(_shard_task, fp, part, options["workers"])] = name
+
+        for fut in as_completed(futures):
+            name = futures[fut]
+            started = fut.result()
+            first_start[name] = min(started, first_start.get(name, started))
+            pending[name] -= 1
+            if pending[name] == 0:
+                out_file = OUTPUT_DIR / f"{source_name_of(name)}_districts_normalized.csv"
+                _concat_parts(parts[name], out_file)
+                timings[name] = time.time() - first_start[name]
+                print(f"✅ Normalized {name} ({len(parts[name])} shards) → {out_file}")
+
+    return timings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Normalize UIDAI district names against the registry")
+    parser.add_argument("--stream", action="store_true",
+                        help="read shards in bounded chunks and append output incrementally")
+    parser.add_argument("--max-memory-mb", type=float, default=None,
+                        help=f"memory ceiling for one chunk in --stream mode (default {STREAM_MAX_MEMORY_MB})")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="explicit chunk size for --stream (overrides --max-memory-mb)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="normalize datasets concurrently in this many processes")
+    parser.add_argument("--per-shard", action="store_true",
+                        help="with --processes, make every shard its own task")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only normalize shards that are new or changed since the last run")
+    args = parser.parse_args()
+
+    stream_flags = [
+        flag for flag, value in (
+            ("--stream", args.stream),
+            ("--max-memory-mb", args.max_memory_mb is not None),
+            ("--chunk-rows", args.chunk_rows is not None),
+        ) if value
+    ]
+    if (args.max_memory_mb is not None or args.chunk_rows is not None) and not args.stream:
+        parser.error("--max-memory-mb and --chunk-rows only apply with --stream")
+    if args.per_shard and args.processes <= 1:
+        parser.error("--per-shard only applies with --processes > 1")
+    if args.per_shard and stream_flags:
+        parser.error(f"--per-shard normalizes whole shards; it cannot be combined with {', '.join(stream_flags)}")
+    if args.incremental and (stream_flags or args.processes > 1 or args.per_shard):
+        parser.error("--incremental cannot be combined with --stream, --processes or --per-shard")
+
+    registry_index = load_district_registry()
+    options = {}
+    if not args.per_shard:
+        options = dict(
+            stream=args.stream,
+            max_memory_mb=STREAM_MAX_MEMORY_MB if args.max_memory_mb is None else args.max_memory_mb,
+            chunk_rows=args.chunk_rows
+        )
+
+    total_start = time.perf_counter()
+
+    # Process all three datasets: biometric, demographic, and enrolment
+    if args.incremental:
+        timings = {name: normalize_dataset_incremental(name, registry_index) for name in DATASETS}
+    elif args.processes > 1:
+        timings = normalize_datasets_parallel(
+            DATASETS,
+            registry_index,
+            processes=args.processes,
+            per_shard=args.per_shard,
+            **options
+        )
+    else:
+        timings = {name: normalize_dataset(name, registry_index, **options) for name in DATASETS}
+
     print(f"\n{'='*80}")
     print("✅ All datasets processed successfully!")
+    for name in DATASETS:
+        elapsed = timings.get(name)
+        label = "skipped" if elapsed is None else f"{elapsed:.1f}s"
+        print(f"   ⏱️  {source_name_of(name):<12} {label}")
+    print(f"   ⏱️  {'total':<12} {time.perf_counter() - total_start:.1f}s")
     print(f"{'='*80}")
@@ -0,0 +1,176 @@
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------- CONFIG ---------------- #
+
+# Candidate date formats, most likely first (raw UIDAI feeds use dd-mm-YYYY)
+DATE_FORMATS = (
+    "%d-%m-%Y",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%d-%m-%y",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+# Distinct values inspected when detecting the format of a column
+DETECT_SAMPLE = 200
+
+# Parsed values kept per process; the feed has only a few hundred dates
+DATE_CACHE_LIMIT = 100_000
+
+# Month keys: int32 period ordinals, with a sentinel for unknown months that
+# sorts after every real month (as NaT does)
+MONTH_DTYPE = "int32"
+MONTH_NA = np.iinfo(np.int32).max
+
+
+# ---------------- PARSE CACHE ---------------- #
+
+# (format list, raw text) -> datetime64 (NaT when no format matches); the
+# format list is part of the key, so `01/02/2025` parsed day-first is never
+# served to a caller asking for month-first
+_DATE_CACHE: Dict[Tuple[Tuple[str, ...], str], np.datetime64] = {}
+_DATE_CACHE_LOCK = threading.Lock()
+
+
+def clear_parse_cache() -> None:
+    with _DATE_CACHE_LOCK:
+        _DATE_CACHE.clear()
+
+
+def _distinct(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Row codes and distinct values; categoricals reuse their own codes."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Index(uniques)
+
+
+# ---------------- DATES ---------------- #
+
+def detect_date_format(values: Iterable[str],
+                       formats: Sequence[str] = DATE_FORMATS) -> Optional[str]:
+    """Format that parses the most of `values` (ties go to the earlier one)."""
+    sample = pd.Series(list(values), dtype=object).dropna().astype(str).str.strip()
+    sample = sample[sample != ""].drop_duplicates().head(DETECT_SAMPLE)
+    if sample.empty:
+        return None
+
+    best, best_hits = None, 0
+    for fmt in formats:
+        hits = pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum()
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+        if hits == len(sample):
+            break
+    return best
+
+
+def _parse_text(texts: pd.Series, formats: Sequence[str]) -> pd.Series:
+    """Parse distinct date strings: detected format first, then the others."""
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns]")
+    todo = texts.notna() & (texts != "")
+
+    detected = detect_date_format(texts[todo], formats)
+    ordered = ([detected] if detected else []) + [f for f in formats if f != detected]
+    for fmt in ordered:
+        if not todo.any():
+            break
+        attempt = pd.to_datetime(texts[todo], format=fmt, errors="coerce")
+        hit = attempt.notna()
+        parsed[attempt.index[hit]] = attempt[hit]
+        todo[attempt.index[hit]] = False
+    return parsed
+
+
+def parse_dates(series: pd.Series,
+                formats: Sequence[str] = DATE_FORMATS) -> Tuple[pd.Series, int]:
+    """Parse a date column once per distinct value.
+
+    Each distinct text is parsed with an explicitly detected format (no
+    day-first inference) and remembered in a process-wide cache keyed on
+    the text and the `formats` list, so the same values seen again by
+    ingest, aggregation or a later batch cost a dict lookup. Results are
+    gathered back to rows by code.
+
+    Returns (parsed, n_unparsable) where `n_unparsable` counts non-missing
+    rows that matched no format.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, 0
+
+    codes, uniques = _distinct(series)
+    texts = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    formats = tuple(formats)
+
+    with _DATE_CACHE_LOCK:
+        cached = [_DATE_CACHE.get((formats, t)) for t in texts]
+    missing = np.array([v is None for v in cached], dtype=bool)
+
+    values = np.array(
+        [np.datetime64("NaT", "ns") if v is None else v for v in cached],
+        dtype="datetime64[ns]"
+    )
+    if missing.any():
+        fresh = _parse_text(texts[missing], formats).to_numpy(dtype="datetime64[ns]")
+        values[missing] = fresh
+        with _DATE_CACHE_LOCK:
+            if len(_DATE_CACHE) + len(fresh) > DATE_CACHE_LIMIT:
+                _DATE_CACHE.clear()
+            _DATE_CACHE.update(zip(((formats, t) for t in texts[missing]), fresh))
+
+    # trailing NaT so missing values (code -1) map to NaT
+    values = np.append(values, np.datetime64("NaT", "ns"))
+    parsed = pd.Series(values[codes], index=series.index, name=series.name)
+
+    bad = int((np.isnat(values[:-1]).astype(np.int64)[codes[codes >= 0]]).sum())
+    return parsed, bad
+
+
+def parse_date(value, formats: Sequence[str] = DATE_FORMATS) -> Optional[pd.Timestamp]:
+    """Parse a single date string (e.g. a CLI / API bound); None if invalid."""
+    if value is None:
+        return None
+    parsed, _ = parse_dates(pd.Series([value], dtype=object), formats)
+    ts = parsed.iloc[0]
+    return None if pd.isna(ts) else ts
+
+
+# ---------------- MONTHS ---------------- #
+#
+# Months are int32 period ordinals (months since 1970-01, as
+# `pd.Period(..., "M").ordinal`) from aggregation onwards; `YYYY-MM` text is
+# produced only for presentation (CSV output, charts).
+
+def month_ordinals(dates: pd.Series) -> pd.Series:
+    """int32 month ordinal of each date (`MONTH_NA` for missing dates)."""
+    months = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]")
+    ordinals = np.where(np.isnat(months), MONTH_NA, months.astype(np.int64))
+    return pd.Series(ordinals.astype(MONTH_DTYPE), index=dates.index, name="month")
+
+
+def month_labels(ordinals: pd.Series) -> pd.Series:
+    """`YYYY-MM` text of month ordinals, formatted once per distinct month."""
+    codes, uniques = pd.factorize(ordinals, use_na_sentinel=False)
+    uniques = np.asarray(uniques, dtype=np.int64)
+    missing = uniques == MONTH_NA
+    labels = pd.PeriodIndex.from_ordinals(np.where(missing, 0, uniques), freq="M").astype(str)
+    labels = np.where(missing, "NaT", labels.to_numpy(dtype=object))
+    return pd.Series(labels[codes], index=ordinals.index, name=ordinals.name)
+
+
+def parse_month_labels(labels: pd.Series) -> pd.Series:
+    """Month ordinals of `YYYY-MM` text (`MONTH_NA` where unparsable)."""
+    codes, uniques = _distinct(labels)
+    texts = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    months = pd.to_datetime(texts, format="%Y-%m", errors="coerce")
+    ordinals = month_ordinals(months).to_numpy()
+    # trailing MONTH_NA so missing values (code -1) map to MONTH_NA
+    ordinals = np.append(ordinals, np.int32(MONTH_NA))
+    return pd.Series(ordinals[codes], index=labels.index, name=labels.name)
@@ -1,4 +1,7 @@
+from src.execution import working_copy
+
+
 def simple_forecast(df):
-    df = df.copy()
+    df = working_copy(df)
     df["next_month_enrol_prediction"] = df["enrol_total"]
     return df
@@ -0,0 +1,67 @@
+from typing import Optional
+
+import pandas as pd
+
+
+# ---------------- QUALITY SNAPSHOT ---------------- #
+
+class QualitySnapshot:
+    """Raw district names per state, captured before district normalization.
+
+    Holds one row per distinct (state, raw district) pair with its row
+    count, which is all the before vs after reports need, instead of a copy
+    of the whole frame. States are keyed in upper case, as the reports
+    compare them. `record_invalid` adds the frequency of the raw names that
+    normalization could not resolve once it has run.
+    """
+
+    __slots__ = ("names", "invalid")
+
+    def __init__(self, names: pd.DataFrame, invalid: Optional[pd.Series] = None):
+        self.names = names
+        self.invalid = invalid
+
+    @classmethod
+    def capture(cls, df: pd.DataFrame, state_col: str = "state",
+                district_col: str = "district") -> "QualitySnapshot":
+        """One groupby pass over `df` (categorical keys stay codes)."""
+        names = (
+            df.groupby([state_col, district_col], observed=True)
+            .size()
+            .reset_index(name="rows")
+            .rename(columns={state_col: "state", district_col: "district"})
+        )
+        names["state"] = names["state"].astype(str).str.upper()
+        names["district"] = names["district"].astype(str)
+        return cls(names)
+
+    def record_invalid(self, df: pd.DataFrame, district_col: str = "district",
+                       valid_col: str = "is_valid_district") -> None:
+        """Count the raw names of the rows `df` (normalized) flags invalid."""
+        counts = df.loc[~df[valid_col], district_col].value_counts()
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(str)
+        self.invalid = counts
+
+    def district_counts(self) -> pd.Series:
+        """Distinct raw district names per (upper-case) state."""
+        return self.names.groupby("state")["district"].nunique()
+
+    def district_count(self, state: str) -> int:
+        return int(self.names.loc[self.names["state"] == state.upper(), "district"].nunique())
+
+    def state_names(self, state: str) -> pd.DataFrame:
+        """Raw district names of one state with rows and invalid-row counts."""
+        names = self.names[self.names["state"] == state.upper()]
+        names = names.groupby("district", as_index=False)["rows"].sum()
+        if self.invalid is not None:
+            names["invalid_rows_national"] = (
+                names["district"].map(self.invalid).fillna(0).astype("int64")
+            )
+        return names.sort_values("rows", ascending=False, ignore_index=True)
+
+    def invalid_names(self, top: Optional[int] = None) -> pd.Series:
+        """Most frequent invalid raw district names (empty before `record_invalid`)."""
+        if self.invalid is None:
+            return pd.Series(dtype="int64", name="count")
+        return self.invalid if top is None else self.invalid.head(top)
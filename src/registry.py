@@ -0,0 +1,346 @@
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------- PATHS ---------------- #
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+REGISTRY_PATH = BASE_DIR / "data" / "registry" / "districts.csv"
+ARTIFACT_PATH = BASE_DIR / "outputs" / "cache" / "registry_index.pkl"
+
+# Bump when the layout of RegistryIndex changes so old artifacts are rebuilt
+INDEX_VERSION = 2
+
+# Shared category for locations that did not resolve to the registry
+UNMATCHED = "Unmatched"
+
+
+# ---------------- HELPERS ---------------- #
+
+def clean_text(s: pd.Series) -> pd.Series:
+    return (
+        s.astype(str)
+         .str.upper()
+         .str.strip()
+         .str.replace(r"\s+", " ", regex=True)
+    )
+
+
+def token_sort(name: str) -> str:
+    """Same token ordering `fuzz.token_sort_ratio` applies before scoring."""
+    return " ".join(sorted(name.split()))
+
+
+def registry_fingerprint(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _index_fingerprint(path: Path) -> str:
+    return f"v{INDEX_VERSION}:{registry_fingerprint(path)}"
+
+
+def char_ngrams(name: str, n: int = 3) -> set:
+    """Character n-grams of `name`, padded so word edges form their own grams."""
+    padded = f"{' ' * (n - 1)}{name} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+# ---------------- N-GRAM BLOCKING ---------------- #
+
+class NGramIndex:
+    """Inverted index from character n-grams to registry rows.
+
+    Used as a blocking step: `candidates` ranks rows by the number of
+    n-grams they share with the query, so only a handful of names ever
+    reach the fuzzy scorer.
+    """
+
+    __slots__ = ("n", "size", "_postings")
+
+    def __init__(self, names, n: int = 3):
+        self.n = n
+        self.size = len(names)
+
+        postings = {}
+        for row, name in enumerate(names):
+            for gram in char_ngrams(name, n):
+                postings.setdefault(gram, []).append(row)
+        self._postings = {
+            gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()
+        }
+
+    def candidates(self, name: str, limit: int = 10) -> np.ndarray:
+        """Rows sharing the most n-grams with `name`, best first."""
+        hits = [self._postings[g] for g in char_ngrams(name, self.n) if g in self._postings]
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+
+        counts = np.bincount(np.concatenate(hits), minlength=self.size)
+        matched = np.flatnonzero(counts)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-counts[matched], limit - 1)[:limit]]
+
+        # stable order: most shared grams first, registry order on ties
+        return matched[np.lexsort((matched, -counts[matched]))]
+
+
+# ---------------- INDEX ---------------- #
+
+class RegistryIndex:
+    """Compiled, read-only view of the official district registry.
+
+    Rows are stored grouped by normalized state in flat numpy arrays;
+    `state_offsets[i]:state_offsets[i + 1]` is the slice of state `i`.
+    The index behaves like the old `{state_norm: [district_norm, ...]}`
+    dict (`get`, `[]`, `in` on states) and like the set of exact
+    `(state_norm, district_norm)` pairs (`in` on tuples).
+
+    `location_dtypes` gives the categorical dtypes (official state and
+    district names plus `UNMATCHED`) shared by every stream after
+    normalization.
+    """
+
+    __slots__ = (
+        "fingerprint",
+        "state_names",
+        "state_offsets",
+        "district_norm",
+        "district_sorted",
+        "district_official",
+        "state_official",
+        "_state_pos",
+        "_pairs",
+        "_candidates",
+        "_pair_lookup",
+        "_ngrams",
+        "_dtypes",
+    )
+
+    def __init__(self, fingerprint, state_names, state_offsets,
+                 district_norm, district_sorted, district_official, state_official):
+        self.fingerprint = fingerprint
+        self.state_names = state_names
+        self.state_offsets = state_offsets
+        self.district_norm = district_norm
+        self.district_sorted = district_sorted
+        self.district_official = district_official
+        self.state_official = state_official
+        self._build_lookups()
+
+    def _build_lookups(self):
+        self._state_pos = {s: i for i, s in enumerate(self.state_names.tolist())}
+        self._candidates = {}
+        self._pairs = {}
+        for s, i in self._state_pos.items():
+            start, stop = self.state_offsets[i], self.state_offsets[i + 1]
+            names = self.district_norm[start:stop].tolist()
+            self._candidates[s] = names
+            for offset, d in enumerate(names):
+                self._pairs[(s, d)] = start + offset
+        self._pair_lookup = None
+        self._ngrams = None
+        self._dtypes = None
+
+    @classmethod
+    def from_csv(cls, path: Path = REGISTRY_PATH) -> "RegistryIndex":
+        registry = pd.read_csv(path)
+        registry["state_norm"] = clean_text(registry["state"])
+        registry["district_norm"] = clean_text(registry["district"])
+
+        registry = registry.drop_duplicates(
+            subset=["state_norm", "district_norm"]
+        )
+        registry = registry.sort_values("state_norm", kind="stable")
+
+        state_names, state_codes = np.unique(
+            registry["state_norm"].to_numpy(dtype=str), return_inverse=True
+        )
+        state_offsets = np.zeros(len(state_names) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(state_codes, minlength=len(state_names)), out=state_offsets[1:])
+
+        district_norm = registry["district_norm"].to_numpy(dtype=str)
+
+        # official casing of each state: its first spelling in the registry
+        first_rows = np.searchsorted(state_codes, np.arange(len(state_names)))
+        state_official = registry["state"].to_numpy(dtype=str)[first_rows]
+
+        return cls(
+            fingerprint=_index_fingerprint(path),
+            state_names=state_names,
+            state_offsets=state_offsets,
+            district_norm=district_norm,
+            district_sorted=np.array([token_sort(d) for d in district_norm], dtype=str),
+            district_official=registry["district"].to_numpy(dtype=str),
+            state_official=state_official,
+        )
+
+    # -------- serialization -------- #
+
+    def __getstate__(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "state_names": self.state_names,
+            "state_offsets": self.state_offsets,
+            "district_norm": self.district_norm,
+            "district_sorted": self.district_sorted,
+            "district_official": self.district_official,
+            "state_official": self.state_official,
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._build_lookups()
+
+    def save(self, path: Path = ARTIFACT_PATH) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = ARTIFACT_PATH) -> "RegistryIndex":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    # -------- lookups -------- #
+
+    def __len__(self) -> int:
+        return len(self.district_norm)
+
+    def __contains__(self, key) -> bool:
+        if isinstance(key, tuple):
+            return key in self._pairs
+        return key in self._candidates
+
+    def __getitem__(self, state: str) -> list:
+        return self._candidates[state]
+
+    def get(self, state: str, default=None):
+        return self._candidates.get(state, default)
+
+    def states(self) -> list:
+        return self.state_names.tolist()
+
+    def state_slice(self, state: str) -> slice:
+        i = self._state_pos[state]
+        return slice(self.state_offsets[i], self.state_offsets[i + 1])
+
+    def state_of(self, row: int) -> str:
+        """Normalized state of registry row `row`."""
+        return str(self.state_names[np.searchsorted(self.state_offsets, row, side="right") - 1])
+
+    def ngram_index(self) -> NGramIndex:
+        """Trigram index over all registry district names (built on first use)."""
+        if self._ngrams is None:
+            self._ngrams = NGramIndex(self.district_norm.tolist())
+        return self._ngrams
+
+    def national_candidates(self, name: str, limit: int = 10) -> np.ndarray:
+        """Registry rows across all states whose names resemble `name`."""
+        return self.ngram_index().candidates(name, limit)
+
+    def sorted_candidates(self, state: str) -> np.ndarray:
+        """Token-sorted candidate names of `state`, aligned with `get(state)`."""
+        return self.district_sorted[self.state_slice(state)]
+
+    def pair_ids(self, states, districts) -> np.ndarray:
+        """Registry row of each (state_norm, district_norm) pair, -1 if absent."""
+        if self._pair_lookup is None:
+            s_codes = np.repeat(
+                np.arange(len(self.state_names)), np.diff(self.state_offsets)
+            )
+            self._pair_lookup = pd.MultiIndex.from_arrays(
+                [self.state_names[s_codes].astype(object), self.district_norm.astype(object)]
+            )
+        keys = pd.MultiIndex.from_arrays(
+            [np.asarray(states, dtype=object), np.asarray(districts, dtype=object)]
+        )
+        return self._pair_lookup.get_indexer(keys)
+
+    def contains_pairs(self, states, districts) -> np.ndarray:
+        return self.pair_ids(states, districts) >= 0
+
+    def location_dtypes(self) -> Tuple[pd.CategoricalDtype, pd.CategoricalDtype]:
+        """(state, district) categorical dtypes: official names + `UNMATCHED`."""
+        if self._dtypes is None:
+            states = sorted(set(self.state_official.tolist()))
+            districts = sorted(set(self.district_official.tolist()))
+            self._dtypes = (
+                pd.CategoricalDtype(states + [UNMATCHED]),
+                pd.CategoricalDtype(districts + [UNMATCHED]),
+            )
+        return self._dtypes
+
+    def official_states(self, state_norm: pd.Series) -> pd.Series:
+        """Official state name of each normalized state, `UNMATCHED` if unknown.
+
+        Returned with the shared state dtype; looked up once per distinct
+        value.
+        """
+        codes, uniques = pd.factorize(state_norm, use_na_sentinel=False)
+        pos = np.array(
+            [self._state_pos.get(u, -1) if isinstance(u, str) else -1 for u in uniques],
+            dtype=np.int64
+        )
+        names = np.where(pos >= 0, self.state_official[np.maximum(pos, 0)], UNMATCHED)
+        return pd.Series(
+            pd.Categorical(names[codes], dtype=self.location_dtypes()[0]),
+            index=state_norm.index,
+            name="state"
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Registry rows as `state_norm`, `district_norm`, `district`."""
+        s_codes = np.repeat(
+            np.arange(len(self.state_names)), np.diff(self.state_offsets)
+        )
+        return pd.DataFrame({
+            "state_norm": self.state_names[s_codes].astype(object),
+            "district_norm": self.district_norm.astype(object),
+            "district": self.district_official.astype(object),
+        })
+
+
+# ---------------- LOADER ---------------- #
+
+_INDEX_CACHE: Dict[str, RegistryIndex] = {}
+
+
+def load_registry_index(path: Path = REGISTRY_PATH,
+                        artifact: Optional[Path] = ARTIFACT_PATH) -> RegistryIndex:
+    """Return the registry index, built at most once per process.
+
+    The compiled index is persisted to `artifact`; later processes load it
+    directly as long as the registry CSV fingerprint still matches.
+    """
+    key = str(Path(path).resolve())
+    if key in _INDEX_CACHE:
+        return _INDEX_CACHE[key]
+
+    fingerprint = _index_fingerprint(path)
+    index = None
+
+    if artifact is not None and Path(artifact).exists():
+        try:
+            index = RegistryIndex.load(artifact)
+        except Exception:
+            index = None
+        if index is not None and index.fingerprint != fingerprint:
+            index = None
+
+    if index is None:
+        index = RegistryIndex.from_csv(path)
+        if artifact is not None:
+            index.save(artifact)
+
+    _INDEX_CACHE[key] = index
+    return index
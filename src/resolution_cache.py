@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# ---------------- PATHS ---------------- #
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+CACHE_DIR = BASE_DIR / "outputs" / "cache"
+RESOLUTION_CACHE_PATH = CACHE_DIR / "district_resolution.sqlite"
+
+# Bump when the matching logic itself changes so old entries are dropped
+RESOLUTION_LOGIC_VERSION = 2
+
+
+# ---------------- FINGERPRINT ---------------- #
+
+def resolution_fingerprint(registry_path: Path,
+                           district_rename_map: dict,
+                           state_rename_map: dict,
+                           fuzzy_threshold: float) -> str:
+    """Hash every input that can change the outcome of a district resolution."""
+    h = hashlib.sha256()
+    h.update(f"v{RESOLUTION_LOGIC_VERSION}".encode())
+    h.update(Path(registry_path).read_bytes())
+    h.update(json.dumps(district_rename_map, sort_keys=True).encode())
+    h.update(json.dumps(state_rename_map, sort_keys=True).encode())
+    h.update(str(fuzzy_threshold).encode())
+    return h.hexdigest()
+
+
+# ---------------- CACHE ---------------- #
+
+class ResolutionCache:
+    """SQLite-backed map of (state_norm, district_norm) -> resolution.
+
+    A resolution is (match, score, match_type, match_state).
+
+    Entries are stored under the fingerprint they were computed with; rows
+    written under any other fingerprint are purged when the cache is opened,
+    so a registry or rename-map change invalidates them automatically.
+    Pass `path=":memory:"` for a cache that only lives as long as the object.
+    """
+
+    def __init__(self, fingerprint: str, path: Optional[Path] = None):
+        self.fingerprint = fingerprint
+        if path == ":memory:":
+            self.path = path
+        else:
+            self.path = Path(path) if path is not None else RESOLUTION_CACHE_PATH
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, timeout=60)
+
+        # The cache is disposable: drop tables written with an older layout
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(resolutions)")]
+        if columns and "match_state" not in columns:
+            self._conn.execute("DROP TABLE resolutions")
+
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resolutions (
+                fingerprint TEXT NOT NULL,
+                state_norm TEXT NOT NULL,
+                district_norm TEXT NOT NULL,
+                match TEXT,
+                score,
+                match_type TEXT NOT NULL,
+                match_state TEXT,
+                PRIMARY KEY (fingerprint, state_norm, district_norm)
+            )
+            """
+        )
+        self._conn.execute(
+            "DELETE FROM resolutions WHERE fingerprint != ?", (fingerprint,)
+        )
+        self._conn.commit()
+
+        self._entries: Optional[Dict[Tuple[str, str], tuple]] = None
+
+    def _load(self) -> Dict[Tuple[str, str], tuple]:
+        if self._entries is None:
+            rows = self._conn.execute(
+                "SELECT state_norm, district_norm, match, score, match_type, match_state "
+                "FROM resolutions WHERE fingerprint = ?",
+                (self.fingerprint,)
+            )
+            self._entries = {(s, d): tuple(rest) for s, d, *rest in rows}
+        return self._entries
+
+    def get(self, state: str, district: str) -> Optional[tuple]:
+        return self._load().get((state, district))
+
+    def put_many(self, results: Iterable[tuple]) -> None:
+        """Store (state_norm, district_norm, match, score, match_type, match_state) rows."""
+        results = list(results)
+        if not results:
+            return
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO resolutions "
+            "(fingerprint, state_norm, district_norm, match, score, match_type, match_state) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(self.fingerprint, *row) for row in results]
+        )
+        self._conn.commit()
+
+        entries = self._load()
+        for s, d, *rest in results:
+            entries[(s, d)] = tuple(rest)
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
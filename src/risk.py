@@ -1,5 +1,8 @@
+from src.execution import working_copy
+
+
 def compute_risk(df):
-    df = df.copy()
+    df = working_copy(df)
 
     df["update_pressure"] = (
         df.get("demo_updates", 0).fillna(0) +
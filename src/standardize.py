@@ -1,70 +1,174 @@
-def _get_col(df, possible_names):
+import functools
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.execution import working_copy
+
+
+# ---------------- SCHEMA VARIANTS ---------------- #
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# Standard age band -> raw column spellings seen in each UIDAI stream, most
+# preferred first. The first spelling present in a frame is used. Spellings
+# are matched after `canonical_name` (case, spaces and punctuation ignored).
+SCHEMA_VARIANTS = {
+    "enrol": {
+        "child_0_5": ["age_0_5", "age_0_4"],
+        "child_5_17": ["age_5_17", "age_5_17_years"],
+        "adult_18_plus": ["age_18_greater", "age_18_plus"],
+    },
+    "demo": {
+        "child_5_17": ["demo_age_5_17", "age_5_17", "age_5_17_years", "age_5_17_update"],
+        "adult_18_plus": ["demo_age_17_", "age_18_greater", "age_18_plus", "age_18_update"],
+    },
+    "bio": {
+        "child_5_17": ["bio_age_5_17", "age_5_17", "age_5_17_years", "age_5_17_bio"],
+        "adult_18_plus": ["bio_age_17_", "age_18_greater", "age_18_plus", "age_18_bio"],
+    },
+}
+
+# Optional extra spellings, e.g. {"demo": {"child_5_17": ["age_5_to_17"]}};
+# new feed headers can be added here without touching the code
+SCHEMA_VARIANTS_PATH = BASE_DIR / "data" / "schema_variants.json"
+
+# Total column each stream derives from its age bands
+TOTAL_COLUMNS = {
+    "enrol": "enrol_total",
+    "demo": "demo_updates",
+    "bio": "bio_updates",
+}
+
+# dtype of the totals; bands keep the count dtype ingest gave them
+TOTAL_DTYPE = "int32"
+
+# dtype of a declared band whose column is missing from the frame
+MISSING_BAND_DTYPE = "Int32"
+
+
+def canonical_name(col) -> str:
+    """`Age 5-17 ` -> `age_5_17`: the form column spellings are compared in."""
+    return re.sub(r"[^0-9a-z]+", "_", str(col).strip().lower()).strip("_")
+
+
+def load_schema_variants(path: Path = SCHEMA_VARIANTS_PATH) -> dict:
+    """Built-in variant table extended with the spellings listed in `path`."""
+    variants = {
+        stream: {band: list(names) for band, names in bands.items()}
+        for stream, bands in SCHEMA_VARIANTS.items()
+    }
+    path = Path(path)
+    if not path.exists():
+        return variants
+
+    with open(path) as f:
+        extra = json.load(f)
+    for stream, bands in extra.items():
+        for band, names in bands.items():
+            known = variants.setdefault(stream, {}).setdefault(band, [])
+            known.extend(n for n in names if n not in known)
+    return variants
+
+
+VARIANTS = load_schema_variants()
+
+
+def source_columns(stream: str) -> list:
+    """Every raw spelling the `stream` table accepts (for typed reads)."""
+    return [name for names in VARIANTS[stream].values() for name in names]
+
+
+def _resolve_columns(columns, stream: str) -> dict:
+    """Standard band -> the frame column that supplies it (None if absent)."""
+    by_canonical = {}
+    for c in columns:
+        by_canonical.setdefault(canonical_name(c), c)
+
+    resolved = {}
+    for band, names in VARIANTS[stream].items():
+        resolved[band] = next(
+            (by_canonical[canonical_name(n)] for n in names if canonical_name(n) in by_canonical),
+            None
+        )
+    return resolved
+
+
+def _as_count(s: pd.Series) -> pd.Series:
+    """Numeric view of a count column; text is coerced (NA where invalid)."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s
+    values = pd.to_numeric(s, errors="coerce")
+    whole = values.dropna()
+    if (whole == whole.round()).all():
+        return values.astype(MISSING_BAND_DTYPE)
+    return values
+
+
+def standardize(df: pd.DataFrame, stream: str) -> pd.DataFrame:
+    """Map a stream's raw age columns onto the standard bands in one pass.
+
+    Each band declared for `stream` in the variant table is filled from the
+    first matching raw column, keeping its numeric dtype (a declared band
+    with no column is all-NA `Int32`). Bands a stream does not report are
+    not created. The stream total is the sum of its bands with missing
+    values counted as 0.
     """
-    Returns the first column found from possible_names.
-    """
-    for col in possible_names:
-        if col in df.columns:
-            return df[col]
-    return None
+    df = working_copy(df)
+    resolved = _resolve_columns(df.columns, stream)
+
+    total = np.zeros(len(df), dtype=np.int64)
+    for band, source in resolved.items():
+        if source is None:
+            df[band] = pd.Series(pd.NA, index=df.index, dtype=MISSING_BAND_DTYPE)
+            continue
+        values = _as_count(df[source])
+        df[band] = values
+        total += values.to_numpy(dtype=np.float64, na_value=0).astype(np.int64)
+
+    df[TOTAL_COLUMNS[stream]] = total.astype(TOTAL_DTYPE)
+    return df
 
 
-# ---------------- ENROLMENT ----------------
-
-def standardize_enrol(df):
-    df = df.copy()
+def _batched(func):
+    """Let a standardizer take a DataFrame or an iterable of batch DataFrames.
 
-    age_0_5 = _get_col(df, ["age_0_5", "age_0_4"])
-    age_5_17 = _get_col(df, ["age_5_17", "age_5_17_years"])
-    age_18 = _get_col(df, ["age_18_greater", "age_18_plus"])
+    Batches are standardized lazily, one at a time, as they are consumed.
+    """
+    @functools.wraps(func)
+    def wrapper(df):
+        if isinstance(df, pd.DataFrame):
+            return func(df)
+        return (func(batch) for batch in df)
+    return wrapper
 
-    df["child_0_5"] = age_0_5
-    df["child_5_17"] = age_5_17
-    df["adult_18_plus"] = age_18
 
-    df["enrol_total"] = (
-        df["child_0_5"].fillna(0) +
-        df["child_5_17"].fillna(0) +
-        df["adult_18_plus"].fillna(0)
-    )
+# ---------------- ENROLMENT ----------------
 
-    return df
+@_batched
+def standardize_enrol(df):
+    return standardize(df, "enrol")
 
 
 # ---------------- DEMOGRAPHIC UPDATE ----------------
 
+@_batched
 def standardize_demo(df):
-    df = df.copy()
-
-    age_5_17 = _get_col(df, ["age_5_17", "age_5_17_years", "age_5_17_update"])
-    age_18 = _get_col(df, ["age_18_greater", "age_18_plus", "age_18_update"])
-
-    df["child_0_5"] = None
-    df["child_5_17"] = age_5_17
-    df["adult_18_plus"] = age_18
-
-    df["demo_updates"] = (
-        df["child_5_17"].fillna(0) +
-        df["adult_18_plus"].fillna(0)
-    )
-
-    return df
+    return standardize(df, "demo")
 
 
 # ---------------- BIOMETRIC UPDATE ----------------
 
+@_batched
 def standardize_bio(df):
-    df = df.copy()
-
-    age_5_17 = _get_col(df, ["age_5_17", "age_5_17_years", "age_5_17_bio"])
-    age_18 = _get_col(df, ["age_18_greater", "age_18_plus", "age_18_bio"])
+    return standardize(df, "bio")
 
-    df["child_0_5"] = None
-    df["child_5_17"] = age_5_17
-    df["adult_18_plus"] = age_18
 
-    df["bio_updates"] = (
-        df["child_5_17"].fillna(0) +
-        df["adult_18_plus"].fillna(0)
-    )
-
-    return df
+STANDARDIZERS = {
+    "enrol": standardize_enrol,
+    "demo": standardize_demo,
+    "bio": standardize_bio,
+}
@@ -0,0 +1,311 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.parsing import month_labels, parse_month_labels
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
+
+
+# ---------------- CONFIG ---------------- #
+
+# Formats written next to each other for every pipeline output
+OUTPUT_FORMATS = ("csv", "columnar")
+
+# Location columns stored (and returned) as pandas categoricals
+CATEGORICAL_COLUMNS = (
+    "state",
+    "district",
+    "state_norm",
+    "state_final_norm",
+    "district_final",
+    "district_final_norm",
+    "district_clean",
+    "match_type",
+)
+
+# Month keys: int32 period ordinals in memory and in the columnar copy,
+# `YYYY-MM` text in the CSV (the presentation format)
+MONTH_COLUMNS = ("month",)
+
+NPCOLS_SUFFIX = ".npcols"
+PARQUET_SUFFIX = ".parquet"
+
+
+# ---------------- PATHS ---------------- #
+
+def _csv_path(path) -> Path:
+    return Path(path).with_suffix(".csv")
+
+
+def _columnar_path(path) -> Path:
+    suffix = PARQUET_SUFFIX if _HAS_PYARROW else NPCOLS_SUFFIX
+    return Path(path).with_suffix(suffix)
+
+
+def _existing_columnar(path) -> Optional[Path]:
+    """Columnar artifact for `path` that is at least as new as its CSV."""
+    csv = _csv_path(path)
+    candidates = [Path(path).with_suffix(NPCOLS_SUFFIX)]
+    if _HAS_PYARROW:
+        candidates.insert(0, Path(path).with_suffix(PARQUET_SUFFIX))
+
+    for p in candidates:
+        if not p.exists():
+            continue
+        if csv.exists() and os.path.getmtime(p) < os.path.getmtime(csv):
+            # the CSV was rewritten after the columnar copy: it is stale
+            continue
+        return p
+    return None
+
+
+def remove_path(path: Path) -> None:
+    """Delete a file or a directory tree (nothing if it does not exist)."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+# ---------------- ENCODING ---------------- #
+
+def _present_months(df: pd.DataFrame) -> pd.DataFrame:
+    """Month ordinal columns as `YYYY-MM` text, for the CSV."""
+    cols = [c for c in MONTH_COLUMNS if c in df.columns and pd.api.types.is_integer_dtype(df[c])]
+    if not cols:
+        return df
+    df = df.copy(deep=False)
+    for c in cols:
+        df[c] = month_labels(df[c])
+    return df
+
+
+def _parse_months(df: pd.DataFrame) -> pd.DataFrame:
+    """`YYYY-MM` month columns read from a CSV back to ordinals."""
+    for c in MONTH_COLUMNS:
+        if c in df.columns and not pd.api.types.is_integer_dtype(df[c]):
+            df[c] = parse_month_labels(df[c])
+    return df
+
+
+def _encode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for c in df.columns:
+        if c in CATEGORICAL_COLUMNS and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+        elif df[c].dtype == object:
+            kind = pd.api.types.infer_dtype(df[c], skipna=True)
+            if kind in ("integer", "floating", "mixed-integer-float", "decimal"):
+                df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+# -------- numpy column store -------- #
+
+def _write_npcols(df: pd.DataFrame, path: Path) -> None:
+    """One `.npy` file per column plus a JSON schema, in a directory."""
+    tmp = path.with_name(path.name + ".tmp")
+    remove_path(tmp)
+    tmp.mkdir(parents=True)
+
+    meta = {"rows": len(df), "columns": []}
+    for i, c in enumerate(df.columns):
+        s = df[c]
+        col = {"name": str(c), "file": f"{i}.npy"}
+
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            col["kind"] = "category"
+            col["categories"] = s.cat.categories.tolist()
+            col["ordered"] = bool(s.cat.ordered)
+            values = s.cat.codes.to_numpy()
+        elif pd.api.types.is_datetime64_any_dtype(s):
+            col["kind"] = "datetime"
+            col["tz"] = str(s.dt.tz) if s.dt.tz is not None else None
+            if col["tz"] is not None:
+                s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+            values = s.to_numpy()
+        elif pd.api.types.is_bool_dtype(s) and not s.hasnans:
+            col["kind"] = "numeric"
+            values = s.to_numpy(dtype=bool)
+        elif pd.api.types.is_numeric_dtype(s) and s.dtype != object:
+            col["kind"] = "numeric"
+            if isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+                # nullable ints/floats: values + validity mask
+                col["kind"] = "masked"
+                col["dtype"] = str(s.dtype)
+                np.save(tmp / f"{i}.mask.npy", s.isna().to_numpy())
+                values = s.fillna(0).to_numpy(dtype=s.dtype.numpy_dtype)
+            else:
+                values = s.to_numpy()
+        else:
+            # text (or mixed) columns: dictionary-encoded, decoded on read
+            col["kind"] = "text"
+            codes, uniques = pd.factorize(s)
+            col["categories"] = [u if isinstance(u, str) else str(u) for u in uniques.tolist()]
+            values = codes.astype(np.int32)
+
+        np.save(tmp / col["file"], values, allow_pickle=False)
+        meta["columns"].append(col)
+
+    with open(tmp / "_meta.json", "w") as f:
+        json.dump(meta, f)
+
+    remove_path(path)
+    tmp.rename(path)
+
+
+def _read_npcols(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    with open(path / "_meta.json") as f:
+        meta = json.load(f)
+
+    wanted = meta["columns"]
+    if columns is not None:
+        by_name = {c["name"]: c for c in wanted}
+        missing = [c for c in columns if c not in by_name]
+        if missing:
+            raise KeyError(f"Columns not in {path}: {missing}")
+        wanted = [by_name[c] for c in columns]
+
+    data = {}
+    for col in wanted:
+        values = np.load(path / col["file"], allow_pickle=False)
+        kind = col["kind"]
+
+        if kind == "category":
+            data[col["name"]] = pd.Categorical.from_codes(
+                values,
+                categories=col["categories"],
+                ordered=col["ordered"]
+            )
+        elif kind == "text":
+            categories = np.array(col["categories"] + [None], dtype=object)
+            data[col["name"]] = categories[values]
+        elif kind == "datetime":
+            stamps = pd.Series(values)
+            if col["tz"] is not None:
+                stamps = stamps.dt.tz_localize("UTC").dt.tz_convert(col["tz"])
+            data[col["name"]] = stamps
+        elif kind == "masked":
+            mask = np.load(path / col["file"].replace(".npy", ".mask.npy"))
+            data[col["name"]] = pd.array(values, dtype=col["dtype"])
+            data[col["name"]][mask] = pd.NA
+        else:
+            data[col["name"]] = values
+
+    return pd.DataFrame(data)
+
+
+# ---------------- PUBLIC API ---------------- #
+
+def write_table(df: pd.DataFrame, path, formats: Sequence[str] = None) -> List[Path]:
+    """Write `df` in each of `formats` ("csv", "columnar") next to `path`.
+
+    The columnar copy is Parquet when pyarrow is installed, otherwise a numpy
+    column store directory; location columns are stored as categoricals.
+    Month ordinals are written as `YYYY-MM` text in the CSV only.
+    Returns the paths written.
+    """
+    formats = OUTPUT_FORMATS if formats is None else formats
+    written = []
+
+    if "csv" in formats:
+        csv = _csv_path(path)
+        _present_months(df).to_csv(csv, index=False)
+        written.append(csv)
+
+    if "columnar" in formats:
+        written.append(write_columnar(df, path))
+
+    return written
+
+
+def write_columnar(df: pd.DataFrame, path) -> Path:
+    out = _columnar_path(path)
+    encoded = _encode_categoricals(df).reset_index(drop=True)
+    if _HAS_PYARROW:
+        tmp = out.with_name(out.name + ".tmp")
+        encoded.to_parquet(tmp, index=False)
+        os.replace(tmp, out)
+    else:
+        _write_npcols(encoded, out)
+    return out
+
+
+def drop_columnar(path) -> None:
+    """Delete the columnar copy of a table, leaving its CSV as the only copy.
+
+    For CSVs written chunk by chunk (streaming / incremental stitching),
+    where building the columnar copy would parse the whole table at once;
+    `read_table` then reads the CSV.
+    """
+    for suffix in (PARQUET_SUFFIX, NPCOLS_SUFFIX):
+        remove_path(Path(path).with_suffix(suffix))
+
+
+def sync_columnar(path) -> Optional[Path]:
+    """Refresh the columnar copy of a CSV that was written outside `write_table`.
+
+    Used after streaming / stitched CSV writes; reads location columns as
+    categoricals to keep the conversion compact.
+    """
+    if "columnar" not in OUTPUT_FORMATS:
+        for suffix in (PARQUET_SUFFIX, NPCOLS_SUFFIX):
+            remove_path(Path(path).with_suffix(suffix))
+        return None
+
+    csv = _csv_path(path)
+    header = pd.read_csv(csv, nrows=0).columns
+    dtypes = {c: "category" for c in header if c in CATEGORICAL_COLUMNS}
+    return write_columnar(_parse_months(pd.read_csv(csv, dtype=dtypes)), path)
+
+
+def read_table(path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a pipeline table, preferring its columnar copy over the CSV.
+
+    Only `columns` are loaded when given. Falls back to the CSV (with
+    `usecols`) when no up-to-date columnar copy exists.
+    """
+    columnar = _existing_columnar(path)
+    if columnar is not None:
+        if columnar.suffix == PARQUET_SUFFIX:
+            return pd.read_parquet(columnar, columns=list(columns) if columns else None)
+        return _read_npcols(columnar, columns)
+
+    csv = _csv_path(path)
+    if not csv.exists():
+        raise FileNotFoundError(f"No table found at {csv}")
+
+    header = pd.read_csv(csv, nrows=0).columns
+    usecols = list(columns) if columns else None
+    dtypes = {
+        c: "category" for c in (usecols or header) if c in CATEGORICAL_COLUMNS
+    }
+    df = _parse_months(pd.read_csv(csv, usecols=usecols, dtype=dtypes))
+    return df[usecols] if usecols else df
+
+
+def remove_table(path) -> None:
+    """Delete the CSV and any columnar copy of a table."""
+    for suffix in (".csv", PARQUET_SUFFIX, NPCOLS_SUFFIX):
+        remove_path(Path(path).with_suffix(suffix))
+
+
+def table_mtime(path) -> Optional[float]:
+    """Modification time of the newest CSV or columnar copy of a table."""
+    candidates = (_csv_path(path), Path(path).with_suffix(PARQUET_SUFFIX), Path(path).with_suffix(NPCOLS_SUFFIX))
+    times = [os.path.getmtime(p) for p in candidates if p.exists()]
+    return max(times) if times else None
+
+
+def table_exists(path) -> bool:
+    return _csv_path(path).exists() or _existing_columnar(path) is not None
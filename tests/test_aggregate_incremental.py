@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.aggregate as agg  # noqa: E402
+from src.storage import remove_table  # noqa: E402
+
+
+def _source(seed: int, months: str = "2024-01") -> pd.DataFrame:
+    """Normalized-looking rows: 3 districts over 6 months from `months`."""
+    rng = np.random.default_rng(seed)
+    n = 120
+    dates = pd.period_range(months, periods=6, freq="M").to_timestamp()
+    # location columns carry shared categoricals, as after normalization
+    return pd.DataFrame({
+        "state": pd.Categorical(rng.choice(["Gujarat", "Kerala"], n), categories=["Gujarat", "Kerala"]),
+        "district_clean": pd.Categorical(rng.choice(["Alpha", "Beta", "Gamma"], n),
+                                         categories=["Alpha", "Beta", "Gamma"]),
+        "date": rng.choice(dates, n),
+        "child_5_17": rng.integers(0, 50, n),
+        "adult_18_plus": rng.integers(0, 50, n),
+    })
+
+
+def _expected(*frames) -> pd.DataFrame:
+    return agg.aggregate_monthly(pd.concat(frames, ignore_index=True))
+
+
+def test_append_redeliver_remove(tmp_path):
+    s1, s2, s3 = _source(1), _source(2), _source(3, months="2024-05")
+
+    got = agg.update_monthly("t", {"s1": s1, "s2": s2}, state_dir=tmp_path)
+    pd.testing.assert_frame_equal(got, _expected(s1, s2))
+
+    # append a source with later months
+    got = agg.update_monthly("t", {"s3": s3}, state_dir=tmp_path)
+    pd.testing.assert_frame_equal(got, _expected(s1, s2, s3))
+
+    # re-delivered source replaces its old rows; a removed one is subtracted
+    s2_new = s2.iloc[::2]
+    got = agg.update_monthly("t", {"s2": s2_new}, removed=["s1"], state_dir=tmp_path)
+    pd.testing.assert_frame_equal(got, _expected(s2_new, s3))
+    pd.testing.assert_frame_equal(agg.load_monthly_state("t", tmp_path), got)
+
+
+def test_missing_table_is_rebuilt_from_partials(tmp_path):
+    s1, s2, s3 = _source(1), _source(2), _source(3)
+    agg.update_monthly("t", {"s1": s1, "s2": s2}, state_dir=tmp_path)
+
+    table_path, _, _ = agg._state_paths("t", tmp_path)
+    remove_table(table_path)
+
+    got = agg.update_monthly("t", {"s3": s3}, removed=["s1"], state_dir=tmp_path)
+    pd.testing.assert_frame_equal(got, _expected(s2, s3))
+
+
+def test_version_change_requires_rebuild(tmp_path, monkeypatch):
+    s1, s2, s3 = _source(1), _source(2), _source(3)
+    agg.update_monthly("t", {"s1": s1, "s2": s2}, state_dir=tmp_path)
+
+    monkeypatch.setattr(agg, "AGGREGATE_STATE_VERSION", agg.AGGREGATE_STATE_VERSION + 1)
+    with pytest.raises(ValueError, match="rebuild=True"):
+        agg.update_monthly("t", {"s3": s3}, state_dir=tmp_path)
+
+    got = agg.update_monthly("t", {"s2": s2, "s3": s3}, state_dir=tmp_path, rebuild=True)
+    pd.testing.assert_frame_equal(got, _expected(s2, s3))
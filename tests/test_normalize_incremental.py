@@ -0,0 +1,49 @@
+import contextlib
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.normalize_districts as nd  # noqa: E402
+
+
+def _setup(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for n in range(3):
+        pd.DataFrame({
+            "state": ["Gujarat"] * 4,
+            "district": [f"d{n}{i}" for i in range(4)],
+            "count": range(4),
+        }).to_csv(raw / f"shard{n}.csv", index=False)
+
+    out = tmp_path / "after"
+    out.mkdir()
+    monkeypatch.setattr(nd, "OUTPUT_DIR", out)
+    monkeypatch.setattr(nd, "dataset_files", lambda name: sorted(raw.glob("*.csv")))
+    # normalization itself is not under test: rows pass through unchanged
+    monkeypatch.setattr(nd, "normalize_frame", lambda df, **kwargs: df)
+    monkeypatch.setattr(nd, "open_resolution_cache", contextlib.nullcontext)
+    return out / "enrolment_districts_normalized.csv", out / "shards" / "enrolment" / "manifest.json"
+
+
+def test_manifest_reset_rebuilds_instead_of_appending(tmp_path, monkeypatch):
+    out_file, manifest_path = _setup(tmp_path, monkeypatch)
+
+    nd.normalize_dataset_incremental("api_data_aadhar_enrolment", registry_index=None)
+    assert len(pd.read_csv(out_file)) == 12
+
+    # a registry / rename-map change resets the manifest: every shard is new
+    manifest = json.loads(manifest_path.read_text())
+    manifest["fingerprint"] = "stale"
+    manifest_path.write_text(json.dumps(manifest))
+    nd.normalize_dataset_incremental("api_data_aadhar_enrolment", registry_index=None)
+    assert len(pd.read_csv(out_file)) == 12
+
+    # first incremental run over an output written by a full run
+    manifest_path.unlink()
+    nd.normalize_dataset_incremental("api_data_aadhar_enrolment", registry_index=None)
+    assert len(pd.read_csv(out_file)) == 12